@@ -0,0 +1,34 @@
+"""Decorator kiểm tra đăng nhập / phân quyền"""
+from functools import wraps
+
+from flask import flash, redirect, request, session, url_for
+
+
+# --- Decorators ---
+
+
+def login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session:
+            return redirect(url_for('public.login', next=request.path))
+        return f(*args, **kwargs)
+    return decorated_function
+
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session or session.get('role') != 'admin':
+            flash('Bạn không có quyền truy cập trang này', 'error')
+            return redirect(url_for('public.index'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+def partner_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session or session.get('role') not in ['partner', 'admin']:
+            flash('Bạn không có quyền truy cập trang này', 'error')
+            return redirect(url_for('public.index'))
+        return f(*args, **kwargs)
+    return decorated_function
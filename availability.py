@@ -0,0 +1,128 @@
+"""
+Chỉ mục phòng trống trong bộ nhớ.
+
+Mỗi phòng giữ một danh sách khoảng [check_in, check_out) của các booking
+chưa bị hủy và chưa kết thúc lúc nạp, sắp xếp theo check_in. Kiểm tra phòng trống
+chỉ cần bisect trên danh sách này, không phải truy vấn database.
+"""
+import bisect
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+
+def to_datetime(value):
+    """Chuẩn hóa date -> datetime (00:00) để so sánh với cột DateTime"""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+class RoomAvailabilityIndex:
+    """Interval index theo phòng cho các booking chưa bị hủy."""
+
+    def __init__(self, ttl=300):
+        # ttl: số giây trước khi nạp lại toàn bộ từ DB (đồng bộ giữa các worker)
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._rooms = {}      # room_id -> [(check_in, check_out, booking_id), ...]
+        self._max_span = {}   # room_id -> khoảng dài nhất từng có trong danh sách
+        self._bookings = {}   # booking_id -> (room_id, check_in, check_out)
+        self._loaded_at = None
+        self._since = None    # chỉ chứa các booking có check_out sau mốc này
+
+    # ----- Nạp / làm mới -----
+
+    def is_loaded(self):
+        return self._loaded_at is not None
+
+    def covers(self, check_in):
+        """Chỉ mục có đủ dữ liệu để trả lời cho khoảng bắt đầu từ check_in không"""
+        return self._since is None or to_datetime(check_in) >= self._since
+
+    def is_fresh(self):
+        if self._loaded_at is None:
+            return False
+        if self.ttl is None:
+            return True
+        return time.monotonic() - self._loaded_at < self.ttl
+
+    def load(self, rows, since=None):
+        """
+        Nạp lại toàn bộ chỉ mục từ các tuple (booking_id, room_id, check_in, check_out).
+        since: rows chỉ gồm các booking có check_out sau mốc này (None = toàn bộ).
+        """
+        rooms = {}
+        max_span = {}
+        bookings = {}
+        for booking_id, room_id, check_in, check_out in rows:
+            check_in, check_out = to_datetime(check_in), to_datetime(check_out)
+            rooms.setdefault(room_id, []).append((check_in, check_out, booking_id))
+            span = check_out - check_in
+            if span > max_span.get(room_id, timedelta(0)):
+                max_span[room_id] = span
+            bookings[booking_id] = (room_id, check_in, check_out)
+        for intervals in rooms.values():
+            intervals.sort()
+
+        with self._lock:
+            self._rooms = rooms
+            self._max_span = max_span
+            self._bookings = bookings
+            self._since = to_datetime(since)
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    # ----- Cập nhật từng booking -----
+
+    def add(self, booking_id, room_id, check_in, check_out):
+        """Thêm (hoặc thay thế) khoảng thời gian của một booking"""
+        check_in, check_out = to_datetime(check_in), to_datetime(check_out)
+        with self._lock:
+            self._discard(booking_id)
+            bisect.insort(self._rooms.setdefault(room_id, []), (check_in, check_out, booking_id))
+            span = check_out - check_in
+            if span > self._max_span.get(room_id, timedelta(0)):
+                self._max_span[room_id] = span
+            self._bookings[booking_id] = (room_id, check_in, check_out)
+
+    def remove(self, booking_id):
+        with self._lock:
+            self._discard(booking_id)
+
+    def _discard(self, booking_id):
+        entry = self._bookings.pop(booking_id, None)
+        if entry is None:
+            return
+        room_id, check_in, check_out = entry
+        intervals = self._rooms.get(room_id, [])
+        pos = bisect.bisect_left(intervals, (check_in, check_out, booking_id))
+        if pos < len(intervals) and intervals[pos][2] == booking_id:
+            del intervals[pos]
+        # _max_span chỉ tăng, không giảm: vẫn đúng, chỉ quét rộng hơn một chút
+
+    # ----- Truy vấn -----
+
+    def overlapping(self, room_id, check_in, check_out):
+        """Danh sách booking_id giao với khoảng [check_in, check_out) của phòng"""
+        check_in, check_out = to_datetime(check_in), to_datetime(check_out)
+        with self._lock:
+            intervals = self._rooms.get(room_id)
+            if not intervals:
+                return []
+            # Chỉ những booking bắt đầu trong [check_in - max_span, check_out) mới có thể giao nhau
+            lo = bisect.bisect_left(intervals, (check_in - self._max_span[room_id],))
+            hi = bisect.bisect_left(intervals, (check_out,))
+            return [b_id for b_in, b_out, b_id in intervals[lo:hi] if b_out > check_in]
+
+    def is_available(self, room_id, check_in, check_out):
+        return not self.overlapping(room_id, check_in, check_out)
+
+    def available_rooms(self, room_ids, check_in, check_out):
+        """Lọc ra các room_id còn trống trong khoảng thời gian"""
+        return [room_id for room_id in room_ids if self.is_available(room_id, check_in, check_out)]
@@ -0,0 +1,13 @@
+"""
+Các blueprint của ứng dụng. Module chỉ được import khi blueprint được bật trong create_app(),
+nên worker chỉ phục vụ khách hàng không nạp mã trang quản trị.
+"""
+
+# Tên blueprint -> module chứa biến `bp`
+BLUEPRINT_MODULES = {
+    'public': 'blueprints.public',
+    'booking': 'blueprints.booking',
+    'payment': 'blueprints.payment',
+    'account': 'blueprints.account',
+    'admin': 'blueprints.admin',
+}
@@ -0,0 +1,186 @@
+"""Tài khoản khách hàng: lịch sử đặt phòng, đánh giá, thông tin cá nhân và mật khẩu"""
+import logging
+from datetime import datetime
+
+from flask import Blueprint, flash, redirect, render_template, request, session, url_for
+from sqlalchemy.orm import contains_eager, joinedload
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from auth import login_required
+from booking_service import booking_pager
+from extensions import db
+from models import Booking, Review, Room, User
+from reporting import user_booking_stats
+
+logger = logging.getLogger('muongthanh')
+
+bp = Blueprint('account', __name__)
+
+
+MY_BOOKINGS_PER_PAGE = 20
+
+
+@bp.route('/my-bookings')
+@login_required
+def my_bookings():
+    """Lịch sử đặt phòng (phân trang keyset theo created_at, id; một câu SQL cho mỗi trang)"""
+    user_id = session['user_id']
+    cursor = booking_pager.parse(request.args.get('after'))
+
+    # Phòng, khách sạn và đánh giá (outer join) được nạp cùng câu SQL với booking
+    query = Booking.query.filter(Booking.user_id == user_id)\
+        .outerjoin(Booking.review)\
+        .options(joinedload(Booking.room, innerjoin=True).joinedload(Room.hotel, innerjoin=True),
+                 contains_eager(Booking.review))
+    bookings, next_cursor = booking_pager.page(query, cursor, MY_BOOKINGS_PER_PAGE)
+
+    # Thêm cờ đánh giá cho mỗi booking
+    for booking in bookings:
+        # Kiểm tra điều kiện đánh giá: Đã hoàn thành (completed) và chưa có review
+        can_review = (
+            booking.status == 'completed' and 
+            booking.review is None # Đã nạp sẵn qua outer join, không phát sinh truy vấn
+        )
+        # Gán thuộc tính tạm thời vào đối tượng booking
+        setattr(booking, 'can_review', can_review)
+
+    next_url = url_for('account.my_bookings', after=next_cursor) if next_cursor else None
+    return render_template('my_bookings.html', bookings=bookings, now=datetime.now(),
+                           next_url=next_url, is_first_page=cursor is None)
+
+
+# ===== ROUTE: THÊM ĐÁNH GIÁ =====
+@bp.route('/review/<int:booking_id>/add', methods=['POST'])
+@login_required
+def add_review(booking_id):
+    booking = Booking.query.get_or_404(booking_id)
+    user = User.query.get(session['user_id'])
+    
+    # 1. Kiểm tra điều kiện:
+    if booking.user_id != user.id or booking.status != 'completed':
+        flash('Bạn không thể đánh giá đơn đặt phòng này.', 'danger')
+        return redirect(url_for('account.my_bookings'))
+
+    # Sử dụng thuộc tính 'review' từ backref trong Review Model
+    if booking.review: 
+        flash('Đơn đặt phòng này đã được đánh giá.', 'warning')
+        return redirect(url_for('public.room_detail', room_id=booking.room_id))
+
+    # 2. Lấy dữ liệu từ form
+    try:
+        rating = int(request.form.get('rating'))
+        comment = request.form.get('comment')
+        
+        if not (1 <= rating <= 5):
+            flash('Điểm đánh giá phải từ 1 đến 5.', 'danger')
+            return redirect(url_for('public.room_detail', room_id=booking.room_id))
+
+        # 3. Tạo và lưu đánh giá mới
+        new_review = Review(
+            room_id=booking.room_id,
+            user_id=user.id,
+            booking_id=booking_id,
+            rating=rating,
+            comment=comment
+        )
+        db.session.add(new_review)
+
+        # review_stats (và Hotel.rating) được cập nhật trong cùng transaction, xem review_stats.py
+        db.session.commit()
+        
+        flash('Cảm ơn bạn đã gửi đánh giá!', 'success')
+    
+    except Exception:
+        db.session.rollback()
+        logger.exception("Error adding review")
+        flash('Đã xảy ra lỗi trong quá trình gửi đánh giá.', 'danger')
+
+    return redirect(url_for('account.my_bookings'))
+
+
+
+# ===== ROUTE: TÀI KHOẢN CỦA TÔI VÀ THỐNG KÊ =====
+@bp.route('/my_account', methods=['GET', 'POST'])
+@login_required
+def my_account():
+    """Hiển thị thông tin cá nhân và các chỉ số thống kê đặt phòng của người dùng."""
+    user = User.query.get(session['user_id'])
+    
+    # 1. TÍNH TOÁN CÁC CHỈ SỐ THỐNG KÊ (STATS)
+    # Tổng số lần đặt, hoàn thành, hủy và tổng tiền đã chi trong một câu SQL (có cache theo user)
+    stats = user_booking_stats(user.id)
+
+    # 2. XỬ LÝ POST (Hiện tại không cần thiết vì bạn đã có route update_account riêng)
+    # Phần POST/cập nhật thông tin đã được tách ra update_account và change_password
+
+    # 3. TRUYỀN BIẾN STATS VÀO TEMPLATE
+    # Biến stats đã được truyền vào my_account.html, khắc phục lỗi UndefinedError
+    return render_template('my_account.html', user=user, stats=stats)
+
+# ===== ROUTE: CẬP NHẬT THÔNG TIN TÀI KHOẢN =====
+@bp.route('/my-account/update', methods=['POST'])
+@login_required
+def update_account():
+    """Cập nhật thông tin tài khoản"""
+    user = User.query.get(session['user_id'])
+    
+    full_name = request.form.get('full_name')
+    phone = request.form.get('phone')
+    address = request.form.get('address')
+    
+    if full_name:
+        user.full_name = full_name
+        session['full_name'] = full_name
+    if phone:
+        user.phone = phone
+    if address:
+        user.address = address
+    
+    try:
+        db.session.commit()
+        flash('Cập nhật thông tin thành công!', 'success')
+    except Exception:
+        db.session.rollback()
+        logger.exception("Error updating account")
+        flash('Có lỗi xảy ra, vui lòng thử lại', 'danger')
+    
+    return redirect(url_for('account.my_account'))
+
+
+# ===== ROUTE: ĐỔI MẬT KHẨU =====
+@bp.route('/my-account/change-password', methods=['POST'])
+@login_required
+def change_password():
+    """Đổi mật khẩu"""
+    user = User.query.get(session['user_id'])
+    
+    current_password = request.form.get('current_password')
+    new_password = request.form.get('new_password')
+    confirm_password = request.form.get('confirm_password')
+    
+    # Kiểm tra mật khẩu hiện tại
+    if not check_password_hash(user.password, current_password):
+        flash('Mật khẩu hiện tại không đúng', 'danger')
+        return redirect(url_for('account.my_account'))
+    
+    # Kiểm tra mật khẩu mới
+    if new_password != confirm_password:
+        flash('Mật khẩu xác nhận không khớp', 'danger')
+        return redirect(url_for('account.my_account'))
+    
+    if len(new_password) < 6:
+        flash('Mật khẩu mới phải có ít nhất 6 ký tự', 'danger')
+        return redirect(url_for('account.my_account'))
+    
+    # Cập nhật mật khẩu
+    user.password = generate_password_hash(new_password, method='pbkdf2:sha256')
+    
+    try:
+        db.session.commit()
+        flash('Đổi mật khẩu thành công!', 'success')
+    except Exception:
+        db.session.rollback()
+        logger.exception("Error changing password")
+        flash('Có lỗi xảy ra, vui lòng thử lại', 'danger')
+    
+    return redirect(url_for('account.my_account'))
@@ -0,0 +1,819 @@
+"""Trang quản trị: dashboard, bookings, sơ đồ phòng, đánh giá, doanh thu, khuyến mãi, địa điểm"""
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from flask import Blueprint, flash, jsonify, redirect, render_template, request, url_for
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+from auth import admin_required
+from booking_service import booking_pager
+from extensions import db, pool_stats
+from models import Booking, Hotel, Location, Promotion, Review, Room, User
+from promotions import invalidate_promotions
+from reporting import (BOOKING_STATUS_ORDER, PAYMENT_METHOD_ORDER, as_date, booking_status_counts,
+                       completed_revenue_by_month, completed_revenue_total, kpi_cache,
+                       paid_payment_method_counts, revenue_by_day, revenue_totals)
+from review_feed import review_feed_query, review_page, review_page_json, review_pager
+from review_stats import MAX_BULK_REVIEWS, get_review_stats, moderate_reviews
+
+logger = logging.getLogger('muongthanh')
+
+bp = Blueprint('admin', __name__)
+
+
+# ===== ROUTE ADMIN XÁC NHẬN THANH TOÁN CHUYỂN KHOẢN =====
+@bp.route('/admin/bookings/<int:booking_id>/confirm-payment', methods=['POST'])
+@admin_required
+def admin_confirm_payment(booking_id):
+    """
+    Route cho admin xác nhận thanh toán chuyển khoản ngân hàng
+    """
+    try:
+        booking = Booking.query.get_or_404(booking_id)
+        
+        # Chỉ confirm những booking có payment_status = 'pending'
+        if booking.payment_status == 'pending':
+            booking.payment_status = 'paid'
+            booking.status = 'confirmed'
+            db.session.commit()
+            flash(f'Đã xác nhận thanh toán cho đặt phòng #{booking.id}', 'success')
+        else:
+            flash('Đặt phòng này không ở trạng thái chờ xác nhận', 'warning')
+            
+        return redirect(url_for('admin.admin_bookings'))
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Admin Confirm Payment Error")
+        flash(f'Lỗi khi xác nhận thanh toán: {str(e)}', 'error')
+        return redirect(url_for('admin.admin_bookings'))
+
+
+@bp.route('/admin/bookings/<int:booking_id>/reject-payment', methods=['POST'])
+@admin_required
+def admin_reject_payment(booking_id):
+    """
+    Route cho admin từ chối thanh toán (nếu chuyển khoản không hợp lệ)
+    """
+    try:
+        booking = Booking.query.get_or_404(booking_id)
+        
+        if booking.payment_status == 'pending':
+            booking.payment_status = 'failed'
+            booking.status = 'cancelled'
+            db.session.commit()
+            flash(f'Đã từ chối thanh toán cho đặt phòng #{booking.id}', 'success')
+        else:
+            flash('Đặt phòng này không ở trạng thái chờ xác nhận', 'warning')
+            
+        return redirect(url_for('admin.admin_bookings'))
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Admin Reject Payment Error")
+        flash(f'Lỗi khi từ chối thanh toán: {str(e)}', 'error')
+        return redirect(url_for('admin.admin_bookings'))
+
+@bp.route('/admin/room-map')
+@admin_required
+def admin_room_map():
+    """Sơ đồ phòng theo khách sạn"""
+    check_date_str = request.args.get('date', datetime.now().strftime('%Y-%m-%d'))
+    check_date = datetime.strptime(check_date_str, '%Y-%m-%d')
+    
+    locations = Location.query.all()
+    # Nạp hotel + location + rooms trong một truy vấn (tránh lazy load theo từng hotel)
+    hotels = Hotel.query.options(
+        joinedload(Hotel.location),
+        joinedload(Hotel.rooms)
+    ).order_by(Hotel.id).all()
+
+    # Lấy tất cả booking đang hiệu lực trong ngày một lần, gom theo phòng
+    active_bookings = Booking.query.filter(
+        Booking.check_in <= check_date,
+        Booking.check_out > check_date,
+        Booking.status.in_(['confirmed', 'pending'])
+    ).order_by(Booking.check_in, Booking.id).all()
+
+    booking_by_room = {}
+    for b in active_bookings:
+        booking_by_room.setdefault(b.room_id, b)
+
+    # Gán trạng thái cho mỗi phòng
+    for hotel in hotels:
+        for room in hotel.rooms:
+            current_booking = booking_by_room.get(room.id)
+            room.current_booking = current_booking
+
+            if room.status == 'maintenance':
+                room.current_status = 'maintenance'
+            elif current_booking:
+                # Nếu đã check-in thực tế
+                if current_booking.status == 'checked_in':
+                    room.current_status = 'occupied'
+                # Chưa check-in nhưng đã đặt — DÙ hôm nay = ngày check-in vẫn là "reserved"
+                else:
+                    room.current_status = 'reserved'
+            else:
+                room.current_status = 'available'
+
+            # ✅ SỬA: Đảm bảo floor luôn có giá trị
+            if room.floor is None or room.floor == 0:
+                try:
+                    # Lấy ký tự đầu tiên của room_number làm tầng
+                    room.floor = int(room.room_number[0]) if room.room_number and len(room.room_number) > 0 else 1
+                except (ValueError, IndexError):
+                    room.floor = 1
+    
+    return render_template('admin/room_map.html',
+                         locations=locations,
+                         hotels=hotels,
+                         today=check_date.strftime('%Y-%m-%d'))
+
+
+@bp.route('/admin/room/<int:room_id>/detail')
+@admin_required
+def admin_room_detail(room_id):
+    """API trả về chi tiết phòng"""
+    room = Room.query.get_or_404(room_id)
+    
+    # Booking hiện tại
+    now = datetime.now()
+    current_booking = Booking.query.filter(
+        Booking.room_id == room_id,
+        Booking.check_in <= now,
+        Booking.check_out > now,
+        Booking.status != 'cancelled'
+    ).first()
+    
+    # Upcoming bookings
+    upcoming_bookings = Booking.query.filter(
+        Booking.room_id == room_id,
+        Booking.check_in > now,
+        Booking.status != 'cancelled'
+    ).order_by(Booking.check_in).limit(5).all()
+    
+    # Xác định trạng thái
+    if room.status == 'maintenance':
+        current_status = 'maintenance'
+    elif current_booking:
+        if current_booking.check_in.date() <= now.date():
+            current_status = 'occupied'
+        else:
+            current_status = 'reserved'
+    else:
+        current_status = 'available'
+    
+    return jsonify({
+        'id': room.id,
+        'room_number': room.room_number,
+        'room_type': room.room_type,
+        'price': room.price,
+        'max_people': room.max_people,
+        'current_status': current_status,
+        'current_booking': {
+            'id': current_booking.id,
+            'guest_name': current_booking.guest_name,
+            'check_in': current_booking.check_in.isoformat(),
+            'check_out': current_booking.check_out.isoformat(),
+            'total_price': current_booking.total_price
+        } if current_booking else None,
+        'upcoming_bookings': [{
+            'id': b.id,
+            'guest_name': b.guest_name,
+            'check_in': b.check_in.isoformat(),
+            'check_out': b.check_out.isoformat()
+        } for b in upcoming_bookings]
+    })
+
+
+@bp.route('/admin/pool-stats')
+@admin_required
+def admin_pool_stats():
+    """API trả về trạng thái connection pool (checked-out, overflow, thời gian chờ...)"""
+    return jsonify(pool_stats.snapshot())
+
+
+# ===== QUẢN LÝ ĐÁNH GIÁ =====
+@bp.route('/admin/reviews')
+@admin_required
+def admin_reviews():
+    """Quản lý đánh giá (lọc theo trạng thái/số sao phía server, mặc định chờ duyệt; phân trang keyset)"""
+    filters = _review_filters()
+    reviews, next_cursor = _admin_review_page(filters)
+
+    return render_template('admin/reviews.html', reviews=reviews, stats=_review_counters(),
+                           filters=filters, next_cursor=next_cursor)
+
+
+@bp.route('/admin/reviews/feed')
+@admin_required
+def admin_reviews_feed():
+    """Trang tiếp theo của admin_reviews dạng JSON (nút "Xem thêm")"""
+    reviews, next_cursor = _admin_review_page(_review_filters())
+    return jsonify(review_page_json(reviews, next_cursor, 'admin/review_card.html', with_room=True))
+
+
+def _review_counters():
+    """Số đánh giá theo trạng thái và điểm trung bình (review đã duyệt), đọc từ bảng tổng hợp"""
+    review_stats = get_review_stats('all')
+    return {
+        'total': review_stats.total,
+        'pending': review_stats.pending_count,
+        'approved': review_stats.approved_count,
+        'average_rating': review_stats.average
+    }
+
+
+def _review_filters():
+    """Bộ lọc của trang đánh giá từ query string: status ('all' = mọi trạng thái), rating"""
+    return {
+        'status': request.args.get('status') or 'pending',
+        'rating': request.args.get('rating', type=int),
+    }
+
+
+def _admin_review_page(filters):
+    status = None if filters['status'] == 'all' else filters['status']
+    query = review_feed_query(status=status, rating=filters['rating'], with_room=True)
+    return review_page(query, review_pager.parse(request.args.get('after')))
+
+
+@bp.route('/admin/reviews/bulk', methods=['POST'])
+@admin_required
+def admin_bulk_moderate_reviews():
+    """
+    Duyệt/từ chối/trả lời nhiều đánh giá một lần, trả về JSON.
+    Body (JSON hoặc form): ids (danh sách id), action ('approve', 'reject', 'reply'), reply (khi action='reply').
+    """
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {'ids': request.form.getlist('ids'), 'action': request.form.get('action'),
+                'reply': request.form.get('reply')}
+
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Dữ liệu gửi lên phải là một object JSON'}), 400
+
+    action = data.get('action')
+    reply = data.get('reply') or ''
+    if not isinstance(reply, str):
+        return jsonify({'error': 'Nội dung phản hồi không hợp lệ'}), 400
+    reply = reply.strip()
+    ids = data.get('ids') or []
+    if not isinstance(ids, list):
+        return jsonify({'error': 'Danh sách id không hợp lệ'}), 400
+    try:
+        review_ids = [int(review_id) for review_id in ids]
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Danh sách id không hợp lệ'}), 400
+    if action not in ('approve', 'reject', 'reply'):
+        return jsonify({'error': 'Thao tác không hợp lệ'}), 400
+    if action == 'reply' and not reply:
+        return jsonify({'error': 'Vui lòng nhập nội dung phản hồi'}), 400
+    if not review_ids:
+        return jsonify({'error': 'Chưa chọn đánh giá nào'}), 400
+    if len(review_ids) > MAX_BULK_REVIEWS:
+        return jsonify({'error': f'Tối đa {MAX_BULK_REVIEWS} đánh giá mỗi lần'}), 400
+
+    try:
+        result = moderate_reviews(review_ids, action, reply=reply or None)
+    except Exception:
+        logger.exception("Error moderating reviews in bulk")
+        return jsonify({'error': 'Có lỗi xảy ra, chưa đánh giá nào được cập nhật'}), 500
+
+    return jsonify(dict(result, action=action, stats=_review_counters()))
+
+
+@bp.route('/admin/reviews/<int:review_id>/approve', methods=['POST'])
+@admin_required
+def admin_approve_review(review_id):
+    """Duyệt đánh giá"""
+    review = Review.query.get_or_404(review_id)
+    review.status = 'approved'
+    
+    try:
+        db.session.commit()
+        flash('Đã duyệt đánh giá', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Lỗi: {str(e)}', 'error')
+    
+    return redirect(url_for('admin.admin_reviews'))
+
+
+@bp.route('/admin/reviews/<int:review_id>/reject', methods=['POST'])
+@admin_required
+def admin_reject_review(review_id):
+    """Từ chối đánh giá"""
+    review = Review.query.get_or_404(review_id)
+    review.status = 'rejected'
+    
+    try:
+        db.session.commit()
+        flash('Đã từ chối đánh giá', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Lỗi: {str(e)}', 'error')
+    
+    return redirect(url_for('admin.admin_reviews'))
+
+
+@bp.route('/admin/reviews/<int:review_id>/reply', methods=['POST'])
+@admin_required
+def admin_reply_review(review_id):
+    """Trả lời đánh giá"""
+    review = Review.query.get_or_404(review_id)
+    reply = request.form.get('reply', '').strip()
+    
+    if not reply:
+        flash('Vui lòng nhập nội dung phản hồi', 'danger')
+        return redirect(url_for('admin.admin_reviews'))
+    
+    review.admin_reply = reply
+    review.reply_at = datetime.now()
+    
+    try:
+        db.session.commit()
+        flash('Đã gửi phản hồi', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Lỗi: {str(e)}', 'error')
+    
+    return redirect(url_for('admin.admin_reviews'))
+
+
+# ===== THỐNG KÊ DOANH THU =====
+@bp.route('/admin/revenue')
+@admin_required
+def admin_revenue():
+    """Thống kê doanh thu"""
+    period = request.args.get('period', 'month')
+    
+    # Tính toán khoảng thời gian
+    now = datetime.now()
+    if period == 'day':
+        start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_date = now
+    elif period == 'week':
+        start_date = now - timedelta(days=now.weekday())
+        end_date = now
+    elif period == 'month':
+        start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        end_date = now
+    elif period == 'year':
+        start_date = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+        end_date = now
+    else:
+        start_date = request.args.get('start_date', now - timedelta(days=30))
+        end_date = request.args.get('end_date', now)
+    
+    # Tổng doanh thu và tổng đặt phòng theo ngày tạo booking (đọc từ bảng daily_revenue)
+    first_day, last_day = as_date(start_date), as_date(end_date)
+    total_revenue, total_bookings = revenue_totals(first_day, last_day)
+    
+    # Giá trị TB
+    avg_booking_value = total_revenue / total_bookings if total_bookings > 0 else 0
+    
+    # Tỷ lệ lấp đầy: số phòng đang có khách lúc này (check_in <= now <= check_out), daily_revenue
+    # không lưu check_out nên vẫn đếm trên bookings (chỉ các booking confirmed đang ở)
+    total_rooms = Room.query.filter_by(status='available').count()
+    occupied_rooms = Booking.query.filter(
+        Booking.status == 'confirmed',
+        Booking.check_in <= now,
+        Booking.check_out >= now
+    ).count()
+    occupancy_rate = (occupied_rooms / total_rooms * 100) if total_rooms > 0 else 0
+    
+    # So sánh với 30 ngày trước kỳ này
+    prev_revenue, prev_bookings = revenue_totals(first_day - timedelta(days=30), first_day - timedelta(days=1))
+    prev_revenue = prev_revenue or 1
+    prev_bookings = prev_bookings or 1
+    
+    revenue_growth = ((total_revenue - prev_revenue) / prev_revenue * 100) if prev_revenue > 0 else 0
+    
+    booking_growth = ((total_bookings - prev_bookings) / prev_bookings * 100) if prev_bookings > 0 else 0
+    
+    stats = {
+        'total_revenue': total_revenue,
+        'total_bookings': total_bookings,
+        'avg_booking_value': avg_booking_value,
+        'occupancy_rate': round(occupancy_rate, 1),
+        'revenue_growth': round(revenue_growth, 1),
+        'booking_growth': round(booking_growth, 1),
+        'avg_value_change': round((avg_booking_value - (prev_revenue/prev_bookings if prev_bookings > 0 else 0)) / (prev_revenue/prev_bookings if prev_bookings > 0 else 1) * 100, 1),
+        'occupancy_change': 5.2
+    }
+    
+    # Dữ liệu biểu đồ doanh thu (30 ngày gần nhất) - một truy vấn GROUP BY theo ngày
+    first_day = (now - timedelta(days=30)).date()
+    daily_revenue = revenue_by_day(first_day, 30)
+    revenue_labels = [day.strftime('%d/%m') for day in daily_revenue]
+    revenue_data = list(daily_revenue.values())
+    
+    # Trạng thái booking
+    status_counts = booking_status_counts()
+    booking_status_data = [status_counts.get(s, 0) for s in BOOKING_STATUS_ORDER]
+    
+    # Phương thức thanh toán
+    method_counts = paid_payment_method_counts()
+    payment_method_data = [method_counts.get(m, 0) for m in PAYMENT_METHOD_ORDER]
+    
+    # Top 5 phòng doanh thu cao
+    try:
+        top_rooms_raw = db.session.query(
+            Room,
+            func.sum(Booking.total_price).label('revenue'),
+            func.count(Booking.id).label('bookings_count')
+        ).join(Booking)\
+        .filter(Booking.payment_status == 'paid')\
+        .group_by(Room.id)\
+        .order_by(func.sum(Booking.total_price).desc())\
+        .limit(5).all()
+        
+        top_rooms = []
+        for room, revenue, count in top_rooms_raw:
+            room.revenue = revenue
+            room.bookings_count = count
+            top_rooms.append(room)
+    except Exception:
+        logger.exception("Error fetching top rooms")
+        top_rooms = []
+    
+    # Booking gần đây (phòng được nạp cùng câu SQL)
+    recent_bookings = Booking.query.options(joinedload(Booking.room)).filter(
+        Booking.payment_status == 'paid'
+    ).order_by(Booking.created_at.desc()).limit(20).all()
+    
+    return render_template('admin/revenue.html',
+                         stats=stats,
+                         revenue_data=revenue_data,
+                         revenue_labels=revenue_labels,
+                         booking_status_data=booking_status_data,
+                         payment_method_data=payment_method_data,
+                         top_rooms=top_rooms,
+                         recent_bookings=recent_bookings)
+
+
+@bp.route('/admin/revenue/export')
+@admin_required
+def admin_revenue_export():
+    """Xuất báo cáo doanh thu"""
+    # TODO: Implement CSV/Excel export
+    flash('Tính năng xuất báo cáo đang được phát triển', 'info')
+    return redirect(url_for('admin.admin_revenue'))
+
+
+@bp.route('/admin/dashboard')
+@admin_required # Giả định hàm admin_required đã được định nghĩa
+def admin_dashboard():
+    # 1. Thống kê cơ bản (cache theo TTL, xóa khi dữ liệu thay đổi)
+    total_users = kpi_cache.get_or_set('total_users', lambda: User.query.count())
+    total_bookings = kpi_cache.get_or_set('total_bookings', lambda: Booking.query.count())
+    total_rooms = kpi_cache.get_or_set('total_rooms', lambda: Room.query.count())
+
+    # 2. Đếm reviews đang chờ duyệt (Sử dụng cột status mới)
+    pending_reviews = kpi_cache.get_or_set(
+        'pending_reviews', lambda: Review.query.filter_by(status='pending').count())
+
+    # 3. Tính tổng doanh thu từ các booking đã hoàn thành ('completed') - đọc từ bảng rollup
+    total_revenue = kpi_cache.get_or_set('total_revenue', completed_revenue_total)
+
+    # 4. Thống kê theo tháng cho biểu đồ
+    monthly_data = kpi_cache.get_or_set('monthly_revenue', completed_revenue_by_month)
+
+    # Chuyển đổi kết quả truy vấn thành format phù hợp cho biểu đồ (tên tháng, doanh thu)
+    months = ["Tháng 1", "Tháng 2", "Tháng 3", "Tháng 4", "Tháng 5", "Tháng 6", 
+              "Tháng 7", "Tháng 8", "Tháng 9", "Tháng 10", "Tháng 11", "Tháng 12"]
+    
+    # Khởi tạo dữ liệu cho 6 tháng gần nhất (để tránh lỗ hổng dữ liệu)
+    data_points = defaultdict(int)
+    current_date = datetime.now().date()
+    
+    for i in range(6):
+        target_month = (current_date.month - i - 1) % 12 + 1
+        target_year = current_date.year if current_date.month >= target_month else current_date.year - 1
+        key = (target_year, target_month)
+        data_points[key] = 0
+
+    # Cập nhật dữ liệu thực tế từ DB
+    for year, month, revenue in monthly_data:
+        data_points[(int(year), int(month))] = float(revenue)
+
+    # Sắp xếp và format lại
+    sorted_data = sorted(data_points.items(), key=lambda item: item[0])
+    
+    chart_labels = [f"{months[m[1]-1]}/{m[0]}" for m, r in sorted_data]
+    chart_data = [r for m, r in sorted_data]
+
+
+    context = {
+        'total_users': total_users,
+        'total_bookings': total_bookings,
+        'total_rooms': total_rooms,
+        'pending_reviews': pending_reviews,
+        'total_revenue': total_revenue,
+        'chart_labels': json.dumps(chart_labels),
+        'chart_data': json.dumps(chart_data)
+    }
+    
+    return render_template('admin/dashboard.html', **context)
+
+# ===== ROUTE ADMIN QUẢN LÝ BOOKINGS =====
+ADMIN_BOOKINGS_PER_PAGE = 50
+
+
+@bp.route('/admin/bookings')
+@admin_required
+def admin_bookings():
+    """Trang quản lý tất cả các đặt phòng (phân trang keyset theo created_at, id)"""
+    per_page = min(max(request.args.get('per_page', ADMIN_BOOKINGS_PER_PAGE, type=int), 1), 200)
+    filters = {
+        'status': request.args.get('status') or None,
+        'payment_status': request.args.get('payment_status') or None,
+        'room_id': request.args.get('room_id', type=int),
+        'date_from': request.args.get('date_from') or None,
+        'date_to': request.args.get('date_to') or None,
+    }
+
+    query = Booking.query.options(joinedload(Booking.room).joinedload(Room.hotel))
+    if filters['status']:
+        query = query.filter(Booking.status == filters['status'])
+    if filters['payment_status']:
+        query = query.filter(Booking.payment_status == filters['payment_status'])
+    if filters['room_id']:
+        query = query.filter(Booking.room_id == filters['room_id'])
+    try:
+        if filters['date_from']:
+            query = query.filter(Booking.created_at >= datetime.strptime(filters['date_from'], '%Y-%m-%d'))
+        if filters['date_to']:
+            query = query.filter(Booking.created_at < datetime.strptime(filters['date_to'], '%Y-%m-%d') + timedelta(days=1))
+    except ValueError:
+        flash('Định dạng ngày tháng không hợp lệ.', 'danger')
+
+    cursor = booking_pager.parse(request.args.get('after'))
+
+    # Trang đầu (không lọc theo thanh toán): các booking chờ xác nhận thanh toán hiển thị trước
+    # (nếu nhiều hơn một trang, hiển thị link sang bộ lọc payment_status=pending)
+    pending_bookings = []
+    more_pending_url = None
+    if not filters['payment_status']:
+        if cursor is None:
+            pending_bookings = query.filter(Booking.payment_status == 'pending')\
+                .order_by(Booking.created_at.desc(), Booking.id.desc())\
+                .limit(per_page + 1).all()
+            if len(pending_bookings) > per_page:
+                pending_bookings = pending_bookings[:per_page]
+                more_pending_url = url_for('admin.admin_bookings', payment_status='pending')
+        query = query.filter(Booking.payment_status != 'pending')
+
+    page, next_cursor = booking_pager.page(query, cursor, per_page)
+
+    params = {k: v for k, v in filters.items() if v}
+    first_url = url_for('admin.admin_bookings', per_page=per_page, **params)
+    next_url = None
+    if next_cursor:
+        next_url = url_for('admin.admin_bookings', per_page=per_page, after=next_cursor, **params)
+
+    # Ghép lại
+    all_bookings = pending_bookings + page
+    
+    return render_template('admin/bookings.html',
+                           bookings=all_bookings,
+                           filters=filters,
+                           first_url=first_url,
+                           more_pending_url=more_pending_url,
+                           next_url=next_url,
+                           is_first_page=cursor is None)
+
+
+@bp.route('/admin')
+@admin_required
+def admin():
+    """Redirect /admin to /admin/dashboard"""
+    return redirect(url_for('admin.admin_dashboard'))
+
+@bp.route('/admin/promotions/add', methods=['POST'])
+@admin_required
+def admin_add_promotion():
+    code = request.form.get('code')
+    discount_percent = request.form.get('discount_percent')
+    start_date = request.form.get('start_date')
+    end_date = request.form.get('end_date')
+    max_uses = request.form.get('max_uses')
+
+    promo = Promotion(
+        code=code,
+        discount_percent=float(discount_percent),
+        start_date=datetime.strptime(start_date, "%Y-%m-%d"),
+        end_date=datetime.strptime(end_date, "%Y-%m-%d"),
+        max_uses=int(max_uses),
+        current_uses=0,
+        active=True
+    )
+
+    db.session.add(promo)
+    db.session.commit()
+    invalidate_promotions()
+
+    return redirect(url_for('admin.admin_promotions'))
+
+@bp.route('/admin/promotions')
+@admin_required
+def admin_promotions():
+    promotions = Promotion.query.all()
+
+    # Tính stats cho dashboard khuyến mãi
+    stats = {
+        "total": len(promotions),
+        "active": sum(1 for p in promotions if p.active),
+        "total_uses": sum(p.current_uses for p in promotions),
+        "total_discount": sum(
+            (p.discount_percent / 100) * 1_000_000  # giá trị tạm demo
+            for p in promotions
+        )
+    }
+
+    return render_template(
+        'admin/promotions.html',
+        promotions=promotions,
+        stats=stats,
+        now=datetime.now()
+    )
+@bp.route('/admin/promotions/toggle/<int:promo_id>', methods=['POST'])
+@admin_required
+def admin_toggle_promotion(promo_id):
+    promo = Promotion.query.get_or_404(promo_id)
+
+    # Đảo trạng thái
+    promo.active = not promo.active
+
+    db.session.commit()
+    invalidate_promotions()
+
+    return redirect(url_for('admin.admin_promotions'))
+
+
+@bp.route('/admin/promotions/<int:promo_id>/delete', methods=['POST'])
+@admin_required
+def admin_delete_promotion(promo_id):
+    """Xóa khuyến mãi"""
+    try:
+        promo = Promotion.query.get_or_404(promo_id)
+        
+        # Kiểm tra xem mã có đang được sử dụng không
+        if promo.current_uses > 0:
+            flash('Không thể xóa mã khuyến mãi đã được sử dụng. Hãy tắt thay vì xóa.', 'warning')
+            return redirect(url_for('admin.admin_promotions'))
+        
+        db.session.delete(promo)
+        db.session.commit()
+        invalidate_promotions()
+        
+        flash(f'Đã xóa mã khuyến mãi {promo.code}', 'success')
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Error deleting promotion")
+        flash(f'Lỗi khi xóa khuyến mãi: {str(e)}', 'error')
+    
+    return redirect(url_for('admin.admin_promotions'))
+
+@bp.route('/admin/promotions/<int:promo_id>/edit', methods=['POST'])
+@admin_required
+def admin_edit_promotion(promo_id):
+    """Chỉnh sửa khuyến mãi"""
+    try:
+        promo = Promotion.query.get_or_404(promo_id)
+        
+        # Cập nhật thông tin
+        promo.discount_percent = float(request.form.get('discount_percent'))
+        promo.min_amount = float(request.form.get('min_amount', 0))
+        promo.start_date = datetime.strptime(request.form.get('start_date'), '%Y-%m-%d')
+        promo.end_date = datetime.strptime(request.form.get('end_date'), '%Y-%m-%d')
+        promo.description = request.form.get('description', '')
+        
+        # Cập nhật max_uses nếu có
+        max_uses = request.form.get('max_uses')
+        if max_uses:
+            promo.max_uses = int(max_uses)
+        else:
+            promo.max_uses = None
+        
+        db.session.commit()
+        invalidate_promotions()
+        flash(f'Đã cập nhật mã khuyến mãi {promo.code}', 'success')
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Error editing promotion")
+        flash(f'Lỗi khi chỉnh sửa khuyến mãi: {str(e)}', 'error')
+    
+    return redirect(url_for('admin.admin_promotions'))
+
+
+# ===== QUẢN LÝ ĐỊA ĐIỂM =====
+@bp.route('/admin/locations')
+@admin_required
+def admin_locations():
+    """Quản lý địa điểm"""
+    locations = Location.query.all()
+    
+    # Tính stats
+    stats = {
+        'total': len(locations),
+        'total_hotels': sum(len(loc.hotels) for loc in locations),
+        'cities': len(set(loc.city for loc in locations if loc.city)),
+        'most_hotels': max((len(loc.hotels) for loc in locations), default=0)
+    }
+    
+    return render_template('admin/locations.html', locations=locations, stats=stats)
+
+
+@bp.route('/admin/locations/add', methods=['POST'])
+@admin_required
+def admin_add_location():
+    """Thêm địa điểm mới"""
+    try:
+        name = request.form.get('name')
+        city = request.form.get('city')
+        description = request.form.get('description', '')
+        
+        # Xử lý upload ảnh (tùy chọn)
+        image_url = None
+        if 'image' in request.files:
+            image_file = request.files['image']
+            if image_file.filename:
+                # TODO: Lưu ảnh vào thư mục static hoặc upload lên cloud
+                # Tạm thời để trống hoặc dùng URL mặc định
+                image_url = f'/static/images/locations/{image_file.filename}'
+        
+        new_location = Location(
+            name=name,
+            city=city,
+            description=description,
+            image=image_url
+        )
+        
+        db.session.add(new_location)
+        db.session.commit()
+        
+        flash(f'Đã thêm địa điểm {name}', 'success')
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Error adding location")
+        flash(f'Lỗi khi thêm địa điểm: {str(e)}', 'error')
+    
+    return redirect(url_for('admin.admin_locations'))
+
+
+@bp.route('/admin/locations/<int:location_id>/edit', methods=['POST'])
+@admin_required
+def admin_edit_location(location_id):
+    """Chỉnh sửa địa điểm"""
+    try:
+        location = Location.query.get_or_404(location_id)
+        
+        location.name = request.form.get('name')
+        location.city = request.form.get('city')
+        location.description = request.form.get('description', '')
+        
+        # Xử lý upload ảnh mới (nếu có)
+        if 'image' in request.files:
+            image_file = request.files['image']
+            if image_file.filename:
+                # TODO: Lưu ảnh
+                location.image = f'/static/images/locations/{image_file.filename}'
+        
+        db.session.commit()
+        flash(f'Đã cập nhật địa điểm {location.name}', 'success')
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Error editing location")
+        flash(f'Lỗi khi chỉnh sửa địa điểm: {str(e)}', 'error')
+    
+    return redirect(url_for('admin.admin_locations'))
+
+
+@bp.route('/admin/locations/<int:location_id>/delete', methods=['POST'])
+@admin_required
+def admin_delete_location(location_id):
+    """Xóa địa điểm"""
+    try:
+        location = Location.query.get_or_404(location_id)
+        
+        # Kiểm tra xem có khách sạn nào không
+        if location.hotels:
+            flash(f'Không thể xóa địa điểm {location.name} vì còn {len(location.hotels)} khách sạn', 'warning')
+            return redirect(url_for('admin.admin_locations'))
+        
+        db.session.delete(location)
+        db.session.commit()
+        
+        flash(f'Đã xóa địa điểm {location.name}', 'success')
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Error deleting location")
+        flash(f'Lỗi khi xóa địa điểm: {str(e)}', 'error')
+    
+    return redirect(url_for('admin.admin_locations'))
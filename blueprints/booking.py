@@ -0,0 +1,313 @@
+"""Đặt phòng: form đặt phòng, đặt nhanh, trang xác nhận, hủy và xem chi tiết booking"""
+import logging
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from flask import Blueprint, flash, jsonify, redirect, render_template, request, session, url_for
+from sqlalchemy import text
+
+from auth import login_required
+from booking_service import RoomUnavailableError, create_booking, is_room_available
+from extensions import db
+from models import Booking, Hotel, Room, User
+from pricing import quote_stay
+from promotions import PromotionUnavailableError, admit_redemption, quote
+from qr_codes import QR_AVAILABLE
+
+logger = logging.getLogger('muongthanh')
+
+bp = Blueprint('booking', __name__)
+
+
+@bp.route('/booking/<int:room_id>', methods=['GET', 'POST'])
+def booking(room_id):
+    user = None
+    room = None
+    
+    # Lấy thông tin phòng (có fallback)
+    try:
+        room = Room.query.get_or_404(room_id)
+    except Exception:
+        logger.warning("Error fetching Room ORM for booking id=%s", room_id, exc_info=True)
+        try:
+            stmt = text('SELECT * FROM rooms WHERE id = :id')
+            row = db.session.execute(stmt, {'id': room_id}).fetchone()
+            if row is None:
+                return ("Room not found", 404)
+            data = dict(row._mapping) if hasattr(row, '_mapping') else dict(row)
+            room = SimpleNamespace(**data)
+        except Exception:
+            logger.exception("Fallback raw SQL also failed for booking id=%s", room_id)
+            return ("Room not found", 404)
+
+    # Lấy thông tin user (nếu có)
+    if 'user_id' in session:
+        try:
+            user = User.query.get(session['user_id'])
+        except Exception:
+            user = None
+    
+    if request.method == 'POST':
+        try:
+            # Lấy và validate dữ liệu đầu vào
+            guest_name = request.form.get('guest_name')
+            guest_phone = request.form.get('guest_phone')
+            guest_address = request.form.get('guest_address')
+            check_in_str = request.form.get('check_in')
+            check_out_str = request.form.get('check_out')
+            
+            check_in = datetime.strptime(check_in_str, '%Y-%m-%d')
+            check_out = datetime.strptime(check_out_str, '%Y-%m-%d')
+            adults = int(request.form.get('adults', 1))
+            children = int(request.form.get('children', 0))
+            total_guests = adults + children
+            
+            # Validation
+            now = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            if check_in < now:
+                flash('Ngày check-in phải từ ngày hiện tại trở đi', 'danger')
+                return redirect(url_for('booking.booking', room_id=room_id))
+            if check_out <= check_in:
+                flash('Ngày check-out phải sau ngày check-in', 'danger')
+                return redirect(url_for('booking.booking', room_id=room_id))
+            if total_guests > getattr(room, 'max_people', 0):
+                flash(f'Số lượng khách tối đa cho phòng này là {getattr(room, "max_people", 0)}', 'danger')
+                return redirect(url_for('booking.booking', room_id=room_id))
+            
+            # Kiểm tra nhanh từ chỉ mục, phòng bị báo bận được xác nhận lại trên DB (dùng được cả
+            # khi room là SimpleNamespace); create_booking() kiểm tra lại trong transaction có khóa phòng
+            available = is_room_available(room_id, check_in, check_out)
+
+            if not available:
+                flash('Phòng đã được đặt trong thời gian này', 'danger')
+                return redirect(url_for('booking.booking', room_id=room_id))
+            
+            # Tính tổng tiền theo giá từng đêm (cuối tuần, mùa, ở dài ngày), xem pricing.py
+            total_price = quote_stay(room, check_in, check_out).total
+            
+            # Xử lý mã giảm giá (tra trong cache, xem promotions.quote)
+            promotion_code = request.form.get('promotion_code')
+            applied_promotion = None
+            if promotion_code:
+                promo_quote = quote(promotion_code, total_price)
+                if promo_quote.valid and not admit_redemption(promo_quote.promotion.id):
+                    # Mã đang quá tải: không tạo booking, trả lại form (giữ thông tin đã nhập) để khách gửi lại
+                    flash('Mã giảm giá đang được sử dụng quá nhiều, vui lòng thử lại sau giây lát', 'warning')
+                    return _render_booking_form(room, user)
+                elif promo_quote.valid:
+                    total_price = promo_quote.total
+                    applied_promotion = promo_quote.promotion
+                elif promo_quote.message:
+                    flash(promo_quote.message, 'warning')
+            
+            # Tạo booking mới
+            new_booking = Booking(
+                user_id=session.get('user_id'),
+                room_id=room_id,
+                check_in=check_in,
+                check_out=check_out,
+                adults=adults,
+                children=children,
+                total_price=total_price,
+                promotion_code=promotion_code if applied_promotion else None,
+                special_requests=request.form.get('special_requests'),
+                guest_name=guest_name,
+                guest_phone=guest_phone,
+                guest_address=guest_address,
+                status='pending',
+                payment_status='unpaid'
+            )
+            
+            # Lưu booking (và trừ một lượt dùng mã giảm giá) trong cùng transaction
+            create_booking(new_booking, promotion=applied_promotion)
+            flash('Đặt phòng thành công! Vui lòng thanh toán', 'success')
+            return redirect(url_for('payment.payment', booking_id=new_booking.id))
+            
+        except RoomUnavailableError:
+            flash('Phòng đã được đặt trong thời gian này', 'danger')
+            return redirect(url_for('booking.booking', room_id=room_id))
+        except PromotionUnavailableError:
+            flash('Mã giảm giá đã hết lượt sử dụng, vui lòng thử lại', 'warning')
+            return redirect(url_for('booking.booking', room_id=room_id))
+        except Exception:
+            db.session.rollback()
+            logger.exception("Error during booking")
+            flash('Có lỗi xảy ra trong quá trình đặt phòng', 'danger')
+            return redirect(url_for('booking.booking', room_id=room_id))
+    
+    # GET request - hiển thị form đặt phòng
+    return _render_booking_form(room, user)
+
+
+def _render_booking_form(room, user):
+    """Form đặt phòng, điền sẵn dữ liệu khách vừa gửi (request.form rỗng với GET)"""
+    hotel = None
+    try:
+        hotel_id = getattr(room, 'hotel_id', None)
+        if hotel_id is not None:
+            hotel = Hotel.query.get(hotel_id)
+    except Exception:
+        hotel = None
+    
+    min_date = datetime.now().strftime('%Y-%m-%d')
+    max_date = (datetime.now() + timedelta(days=365)).strftime('%Y-%m-%d')
+    
+    return render_template('booking.html', 
+                         room=room,
+                         hotel=hotel,
+                         min_date=min_date,
+                         max_date=max_date,
+                         user=user,
+                         form=request.form)
+
+
+@bp.route('/booking/<int:room_id>/quote')
+def booking_quote(room_id):
+    """
+    Báo giá kỳ ở dạng JSON cho phần tóm tắt của form đặt phòng: cùng quote_stay() với lúc tạo booking
+    (phụ thu cuối tuần, theo mùa, giảm giá ở dài ngày), chưa tính mã giảm giá.
+    """
+    room = Room.query.get_or_404(room_id)
+    try:
+        check_in = datetime.strptime(request.args.get('check_in', ''), '%Y-%m-%d')
+        check_out = datetime.strptime(request.args.get('check_out', ''), '%Y-%m-%d')
+    except ValueError:
+        return jsonify({'error': 'Ngày không hợp lệ'}), 400
+    if check_out <= check_in:
+        return jsonify({'error': 'Ngày check-out phải sau ngày check-in'}), 400
+
+    stay = quote_stay(room, check_in, check_out)
+    return jsonify({
+        'nights': stay.nights,
+        'base_total': stay.base_total,
+        'total': stay.total,
+        'nightly_average': round(stay.nightly_average),
+    })
+
+
+@bp.route('/booking/confirm/<int:booking_id>')
+def booking_confirm(booking_id):
+    """Trang xác nhận đặt phòng sau khi thanh toán/ghi nhận thanh toán"""
+    booking = Booking.query.get_or_404(booking_id)
+    
+    # QR code cho trang xác nhận (trình duyệt cache ảnh qua ETag/Cache-Control)
+    qr_url = url_for('payment.booking_qr', booking_id=booking.id, kind='checkin') if QR_AVAILABLE else None
+    
+    # Lấy thông tin phòng để hiển thị chi tiết hơn trong trang xác nhận
+    room = Room.query.get(booking.room_id)
+    
+    return render_template('booking_confirm.html', booking=booking, qr_url=qr_url, room=room)
+
+
+# --- Khác (Giữ nguyên) ---
+@bp.route('/book-now/<int:room_id>')
+@login_required
+def book_now(room_id):
+    # ... (giữ nguyên)
+    room_obj = None
+    try:
+        room_obj = Room.query.get_or_404(room_id)
+    except Exception:
+        logger.warning("Error fetching Room ORM for quick-book id=%s", room_id, exc_info=True)
+        try:
+            stmt = text('SELECT * FROM rooms WHERE id = :id')
+            row = db.session.execute(stmt, {'id': room_id}).fetchone()
+            if row is None:
+                flash('Phòng không tồn tại', 'danger')
+                return redirect(url_for('public.index'))
+            data = dict(row._mapping) if hasattr(row, '_mapping') else dict(row)
+            room_obj = SimpleNamespace(**data)
+        except Exception:
+            logger.exception("Fallback raw SQL failed for quick-book id=%s", room_id)
+            flash('Không thể lấy thông tin phòng, thử lại sau', 'danger')
+            return redirect(url_for('public.index'))
+
+    check_in = datetime.now().replace(hour=14, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    check_out = check_in + timedelta(days=1)
+
+    try:
+        # Dùng được cả khi room_obj là ORM instance hay SimpleNamespace
+        available = is_room_available(room_id, check_in, check_out)
+
+        if not available:
+            flash('Phòng không khả dụng cho ngày mặc định, vui lòng đặt thủ công', 'danger')
+            return redirect(url_for('public.room_detail', room_id=room_id))
+
+        price = quote_stay(room_obj, check_in, check_out).total
+        booking = Booking(
+            user_id=session['user_id'],
+            room_id=room_id,
+            check_in=check_in,
+            check_out=check_out,
+            adults=1,
+            children=0,
+            total_price=price or 0,
+            status='pending',
+            payment_status='unpaid'
+        )
+
+        create_booking(booking)
+        return redirect(url_for('payment.payment', booking_id=booking.id))
+    except RoomUnavailableError:
+        flash('Phòng không khả dụng cho ngày mặc định, vui lòng đặt thủ công', 'danger')
+        return redirect(url_for('public.room_detail', room_id=room_id))
+    except Exception:
+        db.session.rollback()
+        logger.exception("Error creating quick booking")
+        flash('Không thể tạo đặt phòng nhanh, vui lòng thử lại', 'danger')
+        return redirect(url_for('public.room_detail', room_id=room_id))
+
+
+# ===== ROUTE: HỦY ĐẶT PHÒNG (OPTIONAL) =====
+@bp.route('/booking/<int:booking_id>/cancel', methods=['POST'])
+@login_required
+def cancel_booking(booking_id):
+    """Hủy đặt phòng (chỉ khi chưa check-in)"""
+    booking = Booking.query.get_or_404(booking_id)
+    
+    # Kiểm tra quyền
+    if booking.user_id != session['user_id']:
+        flash('Bạn không có quyền hủy đặt phòng này', 'error')
+        return redirect(url_for('account.my_bookings'))
+    
+    # Chỉ cho phép hủy nếu chưa check-in và chưa bị hủy
+    now = datetime.now()
+    if booking.check_in <= now:
+        flash('Không thể hủy đặt phòng đã đến ngày check-in', 'warning')
+        return redirect(url_for('booking.booking_detail', booking_id=booking_id))
+    
+    if booking.status == 'cancelled':
+        flash('Đặt phòng này đã bị hủy trước đó', 'info')
+        return redirect(url_for('booking.booking_detail', booking_id=booking_id))
+    
+    # Hủy booking
+    booking.status = 'cancelled'
+    
+    # Nếu đã thanh toán, có thể thêm logic hoàn tiền ở đây
+    if booking.payment_status == 'paid':
+        # TODO: Xử lý hoàn tiền
+        flash('Đặt phòng đã được hủy. Vui lòng liên hệ để được hoàn tiền.', 'info')
+    
+    try:
+        db.session.commit()
+        flash('Đã hủy đặt phòng thành công', 'success')
+    except Exception:
+        db.session.rollback()
+        logger.exception("Error cancelling booking")
+        flash('Có lỗi xảy ra, vui lòng thử lại', 'danger')
+    
+    return redirect(url_for('account.my_bookings'))
+
+
+@bp.route('/booking/<int:booking_id>')
+@login_required
+def booking_detail(booking_id):
+    """Xem chi tiết đặt phòng"""
+    booking = Booking.query.get_or_404(booking_id)
+    
+    # Kiểm tra quyền: chỉ admin hoặc chủ booking mới xem được
+    if not current_user.is_admin and booking.user_id != current_user.id:
+        flash('Bạn không có quyền xem đặt phòng này', 'danger')
+        return redirect(url_for('account.my_bookings'))
+    
+    return render_template('booking_detail.html', booking=booking)
@@ -0,0 +1,196 @@
+"""Thanh toán: chọn phương thức, mô phỏng MoMo/ZaloPay/VNPay, chuyển khoản và ảnh QR"""
+import hashlib
+import logging
+import threading
+
+from flask import Blueprint, current_app, flash, make_response, redirect, render_template, request, session, url_for
+
+from extensions import db
+from models import Booking
+from qr_codes import QR_AVAILABLE, booking_qr_payload, generate_qr_png
+
+logger = logging.getLogger('muongthanh')
+
+bp = Blueprint('payment', __name__)
+
+
+# Payment services chỉ được tạo khi dùng lần đầu (import app / khởi động worker không phải chờ)
+PAYMENT_SERVICE_CLASSES = {
+    'momo': ('MoMoPayment', 'MOMO_CONFIG'),
+    'vnpay': ('VNPayPayment', 'VNPAY_CONFIG'),
+    'zalopay': ('ZaloPayPayment', 'ZALOPAY_CONFIG'),
+}
+_payment_services = {}
+_payment_services_lock = threading.Lock()
+
+
+def get_payment_service(name):
+    """Trả về service của cổng thanh toán (momo/vnpay/zalopay), khởi tạo một lần cho mỗi process"""
+    service = _payment_services.get(name)
+    if service is None:
+        class_name, config_key = PAYMENT_SERVICE_CLASSES[name]
+        with _payment_services_lock:
+            service = _payment_services.get(name)
+            if service is None:
+                # Giả định payment_services đã có sẵn và chứa MoMoPayment, VNPayPayment, ZaloPayPayment
+                import payment_services
+                service = getattr(payment_services, class_name)(**current_app.config[config_key])
+                _payment_services[name] = service
+    return service
+
+
+@bp.route('/payment/<int:booking_id>')
+def payment(booking_id):
+    """Trang chọn phương thức thanh toán"""
+    booking = Booking.query.get_or_404(booking_id)
+    
+    if booking.user_id is not None:
+        if 'user_id' not in session or booking.user_id != session.get('user_id'):
+            flash('Không có quyền truy cập', 'error')
+            return redirect(url_for('public.index'))
+    
+    # QR code cho thanh toán Banking (MUONGTHANH[BookingID]) được phục vụ qua /qr/<id>.png
+    qr_url = url_for('payment.booking_qr', booking_id=booking.id) if QR_AVAILABLE else None
+    
+    return render_template('payment.html', booking=booking, qr_url=qr_url)
+
+
+# --- Dùng cho mục đích mô phỏng thành công nhanh (MOMO) ---
+@bp.route('/payment/momo/simulate/<int:booking_id>')
+def payment_momo_simulate(booking_id):
+    """Mô phỏng Thanh toán qua MoMo thành công"""
+    try:
+        booking = Booking.query.get_or_404(booking_id)
+        
+        # Kiểm tra quyền truy cập (giữ nguyên)
+        if booking.user_id is not None:
+            if 'user_id' not in session or booking.user_id != session.get('user_id'):
+                flash('Không có quyền truy cập', 'error')
+                return redirect(url_for('public.index'))
+        
+        # Cập nhật trạng thái thành công
+        booking.payment_method = 'momo'
+        booking.payment_status = 'paid'
+        booking.status = 'confirmed'
+        db.session.commit()
+        
+        flash('Mô phỏng: Thanh toán MoMo thành công!', 'success')
+        return redirect(url_for('booking.booking_confirm', booking_id=booking.id))
+            
+    except Exception as e:
+        logger.exception("MoMo Payment Simulate Error")
+        flash(f'Lỗi khi mô phỏng thanh toán MoMo: {str(e)}', 'error')
+        return redirect(url_for('payment.payment', booking_id=booking_id))
+
+
+# --- Dùng cho mục đích mô phỏng thành công nhanh (ZALOPAY) ---
+@bp.route('/payment/zalopay/simulate/<int:booking_id>') # Đổi tên route để tránh trùng lặp
+def payment_zalopay_simulate(booking_id):
+    """Mô phỏng Thanh toán qua ZaloPay thành công"""
+    try:
+        booking = Booking.query.get_or_404(booking_id)
+        
+        # Kiểm tra quyền truy cập (giữ nguyên)
+        if booking.user_id is not None:
+            if 'user_id' not in session or booking.user_id != session.get('user_id'):
+                flash('Không có quyền truy cập', 'error')
+                return redirect(url_for('public.index'))
+        
+        # Cập nhật trạng thái thành công
+        booking.payment_method = 'zalopay'
+        booking.payment_status = 'paid'
+        booking.status = 'confirmed'
+        db.session.commit()
+        
+        flash('Mô phỏng: Thanh toán ZaloPay thành công!', 'success')
+        return redirect(url_for('booking.booking_confirm', booking_id=booking.id))
+            
+    except Exception as e:
+        logger.exception("ZaloPay Payment Simulate Error")
+        flash(f'Lỗi khi mô phỏng thanh toán ZaloPay: {str(e)}', 'error')
+        return redirect(url_for('payment.payment', booking_id=booking_id))
+
+
+@bp.route('/qr/<int:booking_id>.png')
+def booking_qr(booking_id):
+    """Ảnh QR PNG của booking, cho phép trình duyệt cache (nội dung QR không đổi)"""
+    booking = Booking.query.get_or_404(booking_id)
+
+    if booking.user_id is not None:
+        if 'user_id' not in session or booking.user_id != session.get('user_id'):
+            return ("Forbidden", 403)
+
+    kind = request.args.get('kind', 'payment')
+    payload = booking_qr_payload(booking, kind)
+    png = generate_qr_png(payload)
+    if png is None:
+        return ("QR not available", 404)
+
+    response = make_response(png)
+    response.mimetype = 'image/png'
+    response.set_etag(hashlib.sha256(payload.encode('utf-8')).hexdigest())
+    response.cache_control.private = True
+    response.cache_control.max_age = 86400
+    return response.make_conditional(request)
+
+
+@bp.route('/payment/vnpay/<int:booking_id>')
+def payment_vnpay(booking_id):
+    """
+    Route mô phỏng thanh toán VNPay
+    Trong production thực tế, route này sẽ tạo URL VNPay và redirect user đến cổng thanh toán
+    Ở đây chúng ta chỉ mô phỏng kết quả thành công
+    """
+    try:
+        booking = Booking.query.get_or_404(booking_id)
+        
+        # Kiểm tra quyền truy cập
+        if booking.user_id is not None:
+            if 'user_id' not in session or booking.user_id != session.get('user_id'):
+                flash('Không có quyền truy cập', 'error')
+                return redirect(url_for('public.index'))
+        
+        # Mô phỏng: Cập nhật trạng thái thanh toán thành công
+        booking.payment_method = 'vnpay'
+        booking.payment_status = 'paid'
+        booking.status = 'confirmed'
+        db.session.commit()
+        
+        flash('Mô phỏng: Thanh toán VNPay thành công!', 'success')
+        return redirect(url_for('booking.booking_confirm', booking_id=booking.id))
+            
+    except Exception as e:
+        logger.exception("VNPay Payment Simulate Error")
+        flash(f'Lỗi khi mô phỏng thanh toán VNPay: {str(e)}', 'error')
+        return redirect(url_for('payment.payment', booking_id=booking_id))
+
+
+@bp.route('/payment/banking/confirm/<int:booking_id>', methods=['POST'])
+def confirm_qr_payment(booking_id):
+    """
+    Route xác nhận thanh toán chuyển khoản ngân hàng
+    User click "Tôi đã chuyển khoản" sau khi quét QR code
+    """
+    try:
+        booking = Booking.query.get_or_404(booking_id)
+        
+        # Kiểm tra quyền truy cập
+        if booking.user_id is not None:
+            if 'user_id' not in session or booking.user_id != session.get('user_id'):
+                flash('Không có quyền truy cập', 'error')
+                return redirect(url_for('public.index'))
+        
+        # Cập nhật trạng thái - đánh dấu là đang chờ xác nhận từ admin
+        booking.payment_method = 'banking'
+        booking.payment_status = 'pending'  # Chờ admin xác nhận
+        booking.status = 'pending'
+        db.session.commit()
+        
+        flash('Đã ghi nhận thanh toán của bạn! Đơn đặt phòng đang chờ xác nhận từ quản trị viên.', 'info')
+        return redirect(url_for('booking.booking_confirm', booking_id=booking.id))
+            
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Banking Payment Confirm Error")
+        flash(f'Lỗi khi xác nhận thanh toán: {str(e)}', 'error')
+        return redirect(url_for('payment.payment', booking_id=booking_id))
@@ -0,0 +1,260 @@
+"""Trang công khai: trang chủ, đăng ký/đăng nhập, tìm phòng, chi tiết phòng, khuyến mãi"""
+import logging
+from datetime import datetime
+from types import SimpleNamespace
+
+from flask import (Blueprint, current_app, flash, jsonify, redirect, render_template, request, session,
+                   url_for)
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from booking_service import room_availability
+from extensions import db
+from models import Booking, Hotel, Location, Room, User
+from pricing import quote_rooms
+from promotions import promotions_in_effect
+from review_feed import review_feed_query, review_page, review_page_json, review_pager
+from review_stats import get_review_stats
+
+logger = logging.getLogger('muongthanh')
+
+bp = Blueprint('public', __name__)
+
+
+@bp.route('/')
+def index():
+    locations = Location.query.all()
+    try:
+        featured_rooms = Room.query.filter_by(status='available').order_by(Room.id).limit(6).all()
+    except Exception:
+        logger.exception("Error fetching featured rooms")
+        featured_rooms = []
+
+    return render_template('index.html', locations=locations, featured_rooms=featured_rooms)
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    if request.method == 'POST':
+        email = request.form.get('email')
+        password = request.form.get('password')
+        confirm_password = request.form.get('confirm_password')
+        full_name = request.form.get('full_name')
+        phone = request.form.get('phone')
+        
+        if not all([email, password, confirm_password, full_name, phone]):
+            flash('Vui lòng điền đầy đủ thông tin', 'danger')
+            return redirect(url_for('public.register'))
+            
+        if password != confirm_password:
+            flash('Mật khẩu xác nhận không khớp', 'danger')
+            return redirect(url_for('public.register'))
+            
+        if User.query.filter_by(email=email).first():
+            flash('Email đã được sử dụng', 'danger')
+            return redirect(url_for('public.register'))
+        
+        hashed_password = generate_password_hash(password, method='pbkdf2:sha256')
+        
+        new_user = User(
+            email=email,
+            password=hashed_password,
+            full_name=full_name,
+            phone=phone,
+            role='customer'
+        )
+        
+        try:
+            db.session.add(new_user)
+            db.session.commit()
+            flash('Đăng ký thành công! Vui lòng đăng nhập', 'success')
+            return redirect(url_for('public.login'))
+        except Exception:
+            db.session.rollback()
+            logger.exception("Error during registration")
+            flash('Có lỗi xảy ra, vui lòng thử lại', 'danger')
+            return redirect(url_for('public.register'))
+    
+    return render_template('register.html')
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        email = request.form.get('email')
+        password = request.form.get('password')
+        next_url = request.form.get('next') or request.args.get('next')
+        
+        user = User.query.filter_by(email=email).first()
+        if user:
+            is_valid = check_password_hash(user.password, password)
+            
+            if is_valid:
+                session['user_id'] = user.id
+                session['role'] = user.role
+                session['full_name'] = user.full_name
+                flash('Đăng nhập thành công!', 'success')
+                if next_url:
+                    return redirect(next_url)
+                if user.role == 'admin':
+                    # Worker không nạp blueprint admin: chuyển theo đường dẫn để proxy định tuyến
+                    if 'admin.admin_dashboard' not in current_app.view_functions:
+                        return redirect('/admin/dashboard')
+                    return redirect(url_for('admin.admin_dashboard'))
+                elif user.role == 'partner':
+                    return redirect(url_for('partner_dashboard'))
+                else:
+                    return redirect(url_for('public.index'))
+            else:
+                flash('Email hoặc mật khẩu không đúng', 'danger')
+        else:
+            flash('Email hoặc mật khẩu không đúng', 'danger')
+    
+    return render_template('login.html')
+
+@bp.route('/logout')
+def logout():
+    session.clear()
+    flash('Đăng xuất thành công', 'success')
+    return redirect(url_for('public.index'))
+
+
+@bp.route('/search')
+def search():
+    """
+    Tìm kiếm phòng trống có tính đến khoảng thời gian check_in / check_out.
+    """
+    # Lấy tham số và chuyển đổi kiểu
+    location_id = request.args.get('location', type=int)
+    check_in_str = request.args.get('check_in')
+    check_out_str = request.args.get('check_out')
+    guests = request.args.get('guests', type=int)
+    room_type = request.args.get('room_type')
+    
+    # --- 1. Xử lý và kiểm tra ngày tháng ---
+    check_in = None
+    check_out = None
+    
+    try:
+        if check_in_str:
+            check_in = datetime.strptime(check_in_str, '%Y-%m-%d').date()
+        if check_out_str:
+            check_out = datetime.strptime(check_out_str, '%Y-%m-%d').date()
+            
+        if check_in and check_out:
+            if check_out <= check_in:
+                flash('Ngày trả phòng phải sau ngày nhận phòng.', 'warning')
+                check_in, check_out = None, None 
+
+        elif (check_in_str or check_out_str) and not (check_in and check_out):
+            flash('Vui lòng chọn đầy đủ ngày nhận và trả phòng hợp lệ.', 'warning')
+            
+    except ValueError:
+        flash('Định dạng ngày tháng không hợp lệ.', 'danger')
+        check_in, check_out = None, None 
+
+    
+    # --- 2. Áp dụng các bộ lọc cơ bản ---
+    query = Room.query.filter_by(status='available').join(Hotel)
+    
+    if location_id:
+        query = query.filter(Hotel.location_id == location_id)
+
+    if guests:
+        query = query.filter(Room.max_people >= guests)
+        
+    if room_type:
+        query = query.filter(Room.room_type.ilike(f'%{room_type}%'))
+        
+    
+    rooms = query.all()
+
+    # --- 3. Áp dụng LỌC PHÒNG TRỐNG THEO NGÀY (một lần cho tất cả phòng) ---
+    if check_in and check_out:
+        free_room_ids = room_availability(check_in, check_out, room_ids=[room.id for room in rooms]).free_room_ids
+        rooms = [room for room in rooms if room.id in free_room_ids]
+
+    locations = Location.query.all()
+
+    # Tổng tiền thực tế cho cả kỳ ở của mọi phòng, tính một lượt (xem pricing.quote_rooms)
+    quotes = quote_rooms(rooms, check_in, check_out) if check_in and check_out else {}
+    
+    rooms_data = []
+    for room in rooms:
+        quote = quotes.get(room.id)
+        rooms_data.append(SimpleNamespace(
+            id=room.id,
+            room_type=room.room_type,
+            price=room.price,
+            max_people=room.max_people,
+            hotel_name=room.hotel.name,
+            nights=quote.nights if quote else None,
+            total_price=quote.total if quote else None
+        ))
+
+    # Truyền tham số tìm kiếm để form giữ trạng thái
+    return render_template('search.html', 
+                           rooms=rooms_data, 
+                           locations=locations,
+                           search_params={
+                               'location': location_id,
+                               'check_in': check_in_str,
+                               'check_out': check_out_str,
+                               'guests': guests,
+                               'room_type': room_type
+                           })
+
+@bp.route('/room/<int:room_id>')
+def room_detail(room_id):
+    """
+    Hiển thị chi tiết phòng và thông tin đánh giá.
+    Endpoint này phải tồn tại để url_for('public.room_detail', ...) hoạt động.
+    """
+    room = Room.query.get_or_404(room_id)
+    
+    # Trang đầu các review đã duyệt (kèm tác giả), các trang sau lấy qua room_reviews
+    reviews, next_cursor = review_page(review_feed_query(room_id=room_id, status='approved'), None)
+
+    # Điểm trung bình và phân bố sao (review đã duyệt) đọc từ bảng tổng hợp, xem review_stats.py
+    review_stats = get_review_stats('room', room_id)
+    avg_rating = review_stats.average if review_stats.approved_count else None
+    
+    # Kiểm tra quyền đánh giá
+    can_review = False
+    booking_to_review_id = None
+    if 'user_id' in session:
+        user_id = session['user_id']
+        
+        completed_bookings = Booking.query.filter(
+            (Booking.user_id == user_id) & 
+            (Booking.room_id == room_id) &
+            (Booking.status == 'completed')
+        ).all()
+
+        for booking in completed_bookings:
+            if not booking.review: 
+                 can_review = True
+                 booking_to_review_id = booking.id
+                 break 
+                 
+    return render_template('room_detail.html', 
+                             room=room, 
+                             reviews=reviews, 
+                             avg_rating=avg_rating,
+                             review_stats=review_stats,
+                             next_cursor=next_cursor,
+                             can_review=can_review,
+                             booking_to_review_id=booking_to_review_id)
+
+
+@bp.route('/room/<int:room_id>/reviews')
+def room_reviews(room_id):
+    """Trang tiếp theo của review đã duyệt của phòng dạng JSON (nút "Xem thêm" ở room_detail)"""
+    query = review_feed_query(room_id=room_id, status='approved')
+    reviews, next_cursor = review_page(query, review_pager.parse(request.args.get('after')))
+    return jsonify(review_page_json(reviews, next_cursor, 'review_item.html'))
+
+
+@bp.route('/promotions')
+def promotions():
+    """Trang hiển thị các mã khuyến mãi có sẵn cho khách hàng"""
+    # Lấy các promotion đang active và còn hiệu lực (từ cache, xem promotions.py)
+    now = datetime.now()
+    return render_template('promotions.html', promotions=promotions_in_effect(now), now=now)
@@ -0,0 +1,287 @@
+"""
+Nghiệp vụ booking dùng chung cho mọi blueprint: kiểm tra phòng trống (chỉ mục trong bộ nhớ
++ truy vấn tập hợp), tạo booking không trùng lịch, phân trang danh sách booking và job nền
+hoàn thành các booking đã qua check-out.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import and_, select
+
+from availability import RoomAvailabilityIndex, to_datetime
+from extensions import db
+from models import Booking, Hotel, Room
+from pagination import KeysetPager
+from promotions import PromotionUnavailableError, redeem_promotion
+from reporting import apply_rollup_deltas, as_date, invalidate_dashboard_kpis, invalidate_user_stats
+
+logger = logging.getLogger('muongthanh')
+
+
+# ===== CHỈ MỤC PHÒNG TRỐNG =====
+# TTL lấy từ AVAILABILITY_INDEX_TTL khi create_app() khởi tạo
+availability_index = RoomAvailabilityIndex()
+_index_reload_lock = threading.Lock()
+
+
+def get_availability_index():
+    """
+    Trả về chỉ mục phòng trống, nạp lại từ DB nếu chưa có hoặc đã hết TTL.
+    Chỉ nạp các booking chưa kết thúc. Mỗi lúc chỉ một request nạp lại: các request khác dùng
+    tạm dữ liệu cũ (chỉ chờ khi chỉ mục chưa từng được nạp).
+    """
+    if availability_index.is_fresh():
+        return availability_index
+    if not _index_reload_lock.acquire(blocking=not availability_index.is_loaded()):
+        return availability_index
+    try:
+        if not availability_index.is_fresh():
+            since = datetime.now()
+            rows = db.session.query(
+                Booking.id, Booking.room_id, Booking.check_in, Booking.check_out
+            ).filter(Booking.status != 'cancelled', Booking.check_out > since).all()
+            availability_index.load(rows, since=since)
+    finally:
+        _index_reload_lock.release()
+    return availability_index
+
+
+def room_availability(check_in, check_out, room_ids=None, hotel_id=None, location_id=None,
+                      include_conflicts=False):
+    """
+    Kiểm tra phòng trống cho nhiều phòng cùng lúc.
+    Trả về SimpleNamespace(free_room_ids=set, conflicts={room_id: [Booking, ...]}).
+
+    - Chỉ truyền room_ids và không cần conflicts: hỏi chỉ mục trong bộ nhớ trước. Chỉ mục chỉ mang
+      tính gợi ý (có thể chậm tới AVAILABILITY_INDEX_TTL so với worker khác): phòng bị báo bận
+      được kiểm tra lại trên DB, phòng báo trống được create_booking() kiểm tra lại khi đặt.
+    - Ngược lại: một truy vấn duy nhất Room LEFT JOIN Booking (các booking giao nhau).
+    """
+    if room_ids is not None and hotel_id is None and location_id is None and not include_conflicts:
+        index = get_availability_index()
+        if index.covers(check_in):
+            room_ids = list(room_ids)
+            free = set(index.available_rooms(room_ids, check_in, check_out))
+            busy = [room_id for room_id in room_ids if room_id not in free]
+            if busy:
+                free |= _query_room_availability(check_in, check_out, room_ids=busy).free_room_ids
+            return SimpleNamespace(free_room_ids=free, conflicts={})
+    return _query_room_availability(check_in, check_out, room_ids, hotel_id, location_id)
+
+
+def _query_room_availability(check_in, check_out, room_ids=None, hotel_id=None, location_id=None):
+    check_in, check_out = to_datetime(check_in), to_datetime(check_out)
+    query = db.session.query(Room.id, Booking).outerjoin(Booking, and_(
+        Booking.room_id == Room.id,
+        Booking.status != 'cancelled',
+        Booking.check_in < check_out,
+        Booking.check_out > check_in,
+    ))
+    if room_ids is not None:
+        query = query.filter(Room.id.in_(list(room_ids)))
+    if hotel_id is not None:
+        query = query.filter(Room.hotel_id == hotel_id)
+    if location_id is not None:
+        query = query.join(Hotel, Hotel.id == Room.hotel_id).filter(Hotel.location_id == location_id)
+
+    free_room_ids = set()
+    conflicts = defaultdict(list)
+    for room_id, booking in query.all():
+        if booking is None:
+            free_room_ids.add(room_id)
+        else:
+            conflicts[room_id].append(booking)
+    return SimpleNamespace(free_room_ids=free_room_ids, conflicts=dict(conflicts))
+
+
+def is_room_available(room_id, check_in, check_out):
+    return room_id in room_availability(check_in, check_out, room_ids=[room_id]).free_room_ids
+
+
+@db.event.listens_for(db.session, 'after_flush')
+def _collect_booking_changes(session, flush_context):
+    """Ghi nhận các booking thay đổi trong transaction, áp dụng vào chỉ mục khi commit"""
+    changes = session.info.setdefault('availability_changes', {})
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Booking) and obj.id is not None:
+            changes[obj.id] = (obj.room_id, obj.check_in, obj.check_out, obj.status)
+    for obj in session.deleted:
+        if isinstance(obj, Booking):
+            changes[obj.id] = None
+
+
+@db.event.listens_for(db.session, 'after_commit')
+def _apply_booking_changes(session):
+    changes = session.info.pop('availability_changes', None)
+    if not changes or not availability_index.is_fresh():
+        return
+    for booking_id, entry in changes.items():
+        if entry is None or entry[3] == 'cancelled':
+            availability_index.remove(booking_id)
+        else:
+            availability_index.add(booking_id, *entry[:3])
+
+
+@db.event.listens_for(db.session, 'after_rollback')
+def _discard_booking_changes(session):
+    session.info.pop('availability_changes', None)
+
+
+# ===== TẠO BOOKING =====
+class RoomUnavailableError(Exception):
+    """Phòng đã có booking giao với khoảng thời gian yêu cầu"""
+
+
+def room_lock_statement(room_id):
+    """
+    SELECT khóa dòng rooms của phòng (cho các DB có khóa dòng).
+    SQL Server không hiểu FOR UPDATE (with_for_update() bị bỏ qua khi biên dịch) nên cần hint
+    WITH (UPDLOCK, ROWLOCK) riêng; PostgreSQL/MySQL dùng SELECT ... FOR UPDATE.
+    """
+    return select(Room.id).where(Room.id == room_id)\
+        .with_hint(Room, 'WITH (UPDLOCK, ROWLOCK)', 'mssql')\
+        .with_for_update()
+
+
+def lock_room(room_id):
+    """
+    Khóa dòng rooms của phòng tới hết transaction hiện tại, để các request đặt cùng phòng
+    chạy lần lượt. Trả về False nếu phòng không tồn tại.
+    """
+    if db.engine.dialect.name == 'sqlite':
+        # SQLite không có khóa dòng: một UPDATE không đổi dữ liệu giữ khóa ghi của database
+        rooms = Room.__table__
+        result = db.session.execute(rooms.update().where(rooms.c.id == room_id).values(id=rooms.c.id))
+        return result.rowcount > 0
+    return db.session.execute(room_lock_statement(room_id)).scalar() is not None
+
+
+def create_booking(booking, promotion=None):
+    """
+    Lưu booking mới nếu phòng còn trống, trong một transaction:
+    khóa phòng -> kiểm tra trùng lịch trên DB -> insert -> commit.
+    Hai request đặt cùng phòng/ngày không thể cùng vượt qua bước kiểm tra.
+    Raise RoomUnavailableError nếu phòng đã bị đặt, PromotionUnavailableError nếu mã khuyến mãi
+    không còn lượt (transaction được rollback trong cả hai trường hợp).
+    """
+    try:
+        if not lock_room(booking.room_id):
+            raise RoomUnavailableError(f'Room {booking.room_id} not found')
+        # Kiểm tra trên DB (không dùng chỉ mục trong bộ nhớ, có thể chưa thấy booking của worker khác)
+        result = room_availability(booking.check_in, booking.check_out,
+                                   room_ids=[booking.room_id], include_conflicts=True)
+        if booking.room_id not in result.free_room_ids:
+            raise RoomUnavailableError(f'Room {booking.room_id} is already booked')
+
+        if promotion is not None and not redeem_promotion(promotion.id):
+            raise PromotionUnavailableError(promotion.code)
+        db.session.add(booking)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return booking
+
+
+# ===== PHÂN TRANG DANH SÁCH BOOKING =====
+# Booking mới nhất trước; booking_pager.page() trả về (bookings, next_cursor)
+booking_pager = KeysetPager(Booking.created_at, Booking.id)
+
+
+# ===== JOB NỀN: TỰ ĐỘNG CẬP NHẬT TRẠNG THÁI BOOKING =====
+# Số id trong mỗi câu UPDATE ... WHERE id IN (...) (SQL Server giới hạn ~2100 tham số)
+SWEEP_BATCH_SIZE = 500
+
+
+def auto_update_booking_status(now=None):
+    """
+    Chuyển tất cả booking 'confirmed' đã qua check_out thành 'completed'.
+    Trả về số booking đã cập nhật.
+
+    Các booking hết hạn được chọn và khóa một lần (SELECT ... FOR UPDATE, UPDLOCK trên SQL Server);
+    phần chuyển trong daily_revenue và câu UPDATE đều dùng đúng tập id đó, nên booking bị sửa
+    giữa chừng (hủy, đổi thanh toán) không làm lệch bảng tổng hợp.
+    """
+    now = now or datetime.now()
+    try:
+        rows = db.session.execute(
+            select(Booking.id, Booking.created_at, Booking.check_in, Booking.payment_status,
+                   Booking.payment_method, Booking.total_price)
+            .where(Booking.status == 'confirmed', Booking.check_out < now)
+            .with_hint(Booking, 'WITH (UPDLOCK, ROWLOCK)', 'mssql')
+            .with_for_update()
+        ).all()
+        if not rows:
+            db.session.commit()
+            return 0
+
+        # UPDATE hàng loạt không đi qua ORM event nên tự chuyển phần đóng góp trong daily_revenue
+        deltas = defaultdict(lambda: [0, 0.0])
+        for row in rows:
+            common = (row.payment_status or '', row.payment_method or '')
+            revenue = float(row.total_price or 0)
+            for date_basis, value in (('created', row.created_at), ('check_in', row.check_in)):
+                if value is None:
+                    continue
+                old_key = (as_date(value), date_basis, 'confirmed') + common
+                new_key = (as_date(value), date_basis, 'completed') + common
+                deltas[old_key][0] -= 1
+                deltas[old_key][1] -= revenue
+                deltas[new_key][0] += 1
+                deltas[new_key][1] += revenue
+
+        ids = [row.id for row in rows]
+        for i in range(0, len(ids), SWEEP_BATCH_SIZE):
+            Booking.query.filter(Booking.id.in_(ids[i:i + SWEEP_BATCH_SIZE])).update(
+                {Booking.status: 'completed', Booking.updated_at: datetime.utcnow()},
+                synchronize_session=False
+            )
+        apply_rollup_deltas(db.session.connection(), deltas)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    invalidate_dashboard_kpis('Booking')
+    invalidate_user_stats()
+    return len(ids)
+
+
+_sweeper_thread = None
+_sweeper_lock = threading.Lock()
+
+
+def start_booking_sweeper(app, interval=None):
+    """
+    Chạy auto_update_booking_status định kỳ trong một thread nền (mỗi process một thread).
+    create_app() gọi hàm này ở request đầu tiên của mỗi process; gọi lại khi thread đang chạy không làm gì.
+    """
+    global _sweeper_thread
+    interval = interval or app.config['BOOKING_SWEEP_INTERVAL']
+    if not interval or (_sweeper_thread is not None and _sweeper_thread.is_alive()):
+        return _sweeper_thread
+    with _sweeper_lock:
+        if _sweeper_thread is not None and _sweeper_thread.is_alive():
+            return _sweeper_thread
+        _sweeper_thread = _run_sweeper(app, interval)
+    return _sweeper_thread
+
+
+def _run_sweeper(app, interval):
+
+    def run():
+        while True:
+            try:
+                with app.app_context():
+                    auto_update_booking_status()
+            except Exception:
+                logger.exception("Booking sweeper error")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name='booking-sweeper', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,60 @@
+"""
+Cache trong bộ nhớ với TTL riêng cho từng key.
+
+Dùng cho các giá trị đắt để tính nhưng chấp nhận cũ trong vài giây
+(KPI dashboard, thống kê...). Route thay đổi dữ liệu gọi invalidate()
+để xóa key liên quan ngay thay vì chờ hết hạn.
+"""
+import threading
+import time
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Cache key -> value, mỗi key hết hạn sau ttl giây (thread-safe)."""
+
+    def __init__(self, default_ttl=60):
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._data = {}         # key -> (expires_at, value)
+        self._key_locks = {}    # key -> Lock, tránh nhiều request cùng tính lại một key
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def get_or_set(self, key, loader, ttl=None):
+        """Trả về giá trị trong cache, nếu hết hạn thì gọi loader() (mỗi key chỉ một lần)"""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                value = loader()
+                self.set(key, value, ttl)
+            return value
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def invalidate_prefix(self, prefix):
+        with self._lock:
+            for key in [k for k in self._data if isinstance(k, str) and k.startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
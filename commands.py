@@ -0,0 +1,165 @@
+"""Khởi tạo database và các lệnh `flask ...` (index, rollup, tổng hợp đánh giá, job hoàn thành booking)"""
+from datetime import datetime
+
+from flask import current_app
+from werkzeug.security import generate_password_hash
+
+from booking_service import auto_update_booking_status
+from extensions import db
+from models import DailyRevenue, Hotel, Location, Promotion, RateRule, ReviewStats, Room, User
+from reporting import ensure_revenue_rollup, rebuild_revenue_rollup
+from review_stats import rebuild_review_stats
+
+
+def register_commands(app):
+    """Đăng ký các lệnh CLI vào app"""
+
+    @app.cli.command('create-indexes')
+    def create_indexes_command():
+        """Tạo các bảng, index còn thiếu trên database hiện có và điền daily_revenue nếu còn trống"""
+        db.create_all()
+        created = ensure_indexes()
+        print(f"✅ Đã tạo {len(created)} index: {', '.join(created) or '-'}")
+        if ensure_revenue_rollup():
+            print(f"✅ Đã xây daily_revenue từ bookings: {DailyRevenue.query.count()} dòng")
+
+    @app.cli.command('rebuild-revenue-rollup')
+    def rebuild_revenue_rollup_command():
+        """Xây lại bảng daily_revenue từ bảng bookings"""
+        rebuild_revenue_rollup()
+        print(f"✅ Đã xây lại daily_revenue: {DailyRevenue.query.count()} dòng")
+
+    @app.cli.command('rebuild-review-stats')
+    def rebuild_review_stats_command():
+        """Xây lại bảng review_stats và Hotel.rating từ bảng reviews"""
+        rebuild_review_stats()
+        print(f"✅ Đã xây lại review_stats: {ReviewStats.query.count()} dòng")
+
+    @app.cli.command('complete-expired-bookings')
+    def complete_expired_bookings_command():
+        """Hoàn thành các booking đã qua check-out (dùng cho cron)"""
+        updated = auto_update_booking_status()
+        print(f"✅ Đã cập nhật {updated} booking sang completed")
+
+
+def ensure_indexes():
+    """
+    Tạo các index khai báo trong model nhưng chưa có trong database.
+    db.create_all() không thêm index cho bảng đã tồn tại nên cần bước này khi nâng cấp.
+    """
+    created = []
+    inspector = db.inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if not table.indexes or not inspector.has_table(table.name):
+            continue
+        existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=db.engine)
+                created.append(index.name)
+    return created
+
+
+def init_db(app=None):
+    """Khởi tạo database và thêm dữ liệu mẫu"""
+    app = app or current_app._get_current_object()
+    with app.app_context():
+        # Tạo tất cả tables
+        db.create_all() 
+        ensure_indexes()
+        # Database cũ đã có booking nhưng bảng daily_revenue vừa được tạo: tính lại từ bookings
+        ensure_revenue_rollup()
+        
+        # Kiểm tra đã có data chưa
+        if User.query.first() is None:
+            print("Đang khởi tạo dữ liệu mẫu...")
+            
+            # Tạo admin user
+            admin = User(
+                email='admin@muongthanh.com',
+                password=generate_password_hash('admin123', method='pbkdf2:sha256'),
+                full_name='Admin',
+                phone='0123456789',
+                role='admin'
+            )
+            db.session.add(admin)
+            
+            # Tạo customer user
+            customer = User(
+                email='customer@example.com',
+                password=generate_password_hash('123456', method='pbkdf2:sha256'),
+                full_name='Nguyễn Văn A',
+                phone='0987654321',
+                role='customer'
+            )
+            db.session.add(customer)
+            
+            # Tạo locations
+            locations = [
+                Location(name='Hà Nội', city='Hà Nội', description='Thủ đô ngàn năm văn hiến'),
+                Location(name='Hồ Chí Minh', city='TP.HCM', description='Thành phố năng động'),
+                Location(name='Đà Nẵng', city='Đà Nẵng', description='Thành phố đáng sống'),
+            ]
+            db.session.add_all(locations)
+            db.session.commit()
+            
+            # Tạo hotels
+            hotel1 = Hotel(
+                name='Mường Thanh Grand Hà Nội',
+                location_id=locations[0].id,
+                address='40 Bà Triệu, Hoàn Kiếm, Hà Nội',
+                phone='024-3946-2222',
+                email='hanoi@muongthanh.com',
+                description='Khách sạn 5 sao sang trọng',
+                rating=4.5
+            )
+            hotel2 = Hotel(
+                name='Mường Thanh Luxury Sài Gòn',
+                location_id=locations[1].id,
+                address='235 Nguyễn Văn Cừ, Q.1, TP.HCM',
+                phone='028-3838-5555',
+                email='saigon@muongthanh.com',
+                description='Khách sạn cao cấp trung tâm',
+                rating=4.7
+            )
+            db.session.add_all([hotel1, hotel2])
+            db.session.commit()
+            
+            # Tạo rooms
+            rooms = [
+                Room(hotel_id=hotel1.id, room_number='101', room_type='Standard', 
+                     price=800000, max_people=2, size=25, status='available'),
+                Room(hotel_id=hotel1.id, room_number='201', room_type='Deluxe', 
+                     price=1200000, max_people=3, size=35, status='available'),
+                Room(hotel_id=hotel1.id, room_number='301', room_type='Suite', 
+                     price=2000000, max_people=4, size=50, status='available'),
+                Room(hotel_id=hotel2.id, room_number='102', room_type='Standard', 
+                     price=900000, max_people=2, size=28, status='available'),
+                Room(hotel_id=hotel2.id, room_number='202', room_type='Deluxe', 
+                     price=1500000, max_people=3, size=40, status='available'),
+            ]
+            db.session.add_all(rooms)
+            
+            # Tạo promotions
+            promo = Promotion(
+                code='WELCOME2025',
+                description='Giảm 10% cho khách hàng mới',
+                discount_percent=10,
+                min_amount=500000,
+                max_uses=100,
+                start_date=datetime(2025, 1, 1),
+                end_date=datetime(2025, 12, 31),
+                active=True
+            )
+            db.session.add(promo)
+
+            # Tạo quy tắc giá theo đêm (xem pricing.py)
+            db.session.add_all([
+                RateRule(name='Cuối tuần', kind='weekend', adjust_percent=20),
+                RateRule(name='Ở từ 7 đêm', kind='long_stay', adjust_percent=-10, min_nights=7),
+            ])
+            
+            db.session.commit()
+            print("✅ Khởi tạo dữ liệu mẫu thành công!")
+            print("📧 Admin: admin@muongthanh.com / admin123")
+            print("📧 Customer: customer@example.com / 123456")
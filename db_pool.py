@@ -0,0 +1,123 @@
+"""
+Cấu hình connection pool từ biến môi trường và thống kê hoạt động của pool.
+
+Biến môi trường:
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT (giây), DB_POOL_RECYCLE (giây),
+    DB_POOL_PRE_PING (1/0), DB_FAST_EXECUTEMANY (1/0, chỉ mssql+pyodbc), DB_CONNECT_TIMEOUT (giây)
+"""
+import threading
+import time
+
+from sqlalchemy import event, exc
+
+from config import env_bool, env_int
+
+
+def engine_options_from_env(database_uri):
+    """SQLALCHEMY_ENGINE_OPTIONS phù hợp với dialect của database_uri"""
+    dialect = database_uri.split(':', 1)[0]
+    options = {
+        'pool_pre_ping': env_bool('DB_POOL_PRE_PING', True),
+        'pool_recycle': env_int('DB_POOL_RECYCLE', 1800),
+    }
+    connect_timeout = env_int('DB_CONNECT_TIMEOUT', 10)
+
+    if dialect.startswith('sqlite'):
+        # SQLite: không cần kích thước pool, timeout là thời gian chờ khóa file
+        options['connect_args'] = {'timeout': connect_timeout}
+        return options
+
+    options.update({
+        'pool_size': env_int('DB_POOL_SIZE', 10),
+        'max_overflow': env_int('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': env_int('DB_POOL_TIMEOUT', 30),
+    })
+    if dialect.startswith('mssql'):
+        options['connect_args'] = {'timeout': connect_timeout}
+        if dialect == 'mssql+pyodbc':
+            options['fast_executemany'] = env_bool('DB_FAST_EXECUTEMANY', True)
+    elif dialect.startswith('postgresql'):
+        options['connect_args'] = {'connect_timeout': connect_timeout}
+    return options
+
+
+class PoolStats:
+    """Đếm checkout/checkin, kết nối mới, kết nối bị hủy và thời gian chờ lấy kết nối từ pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.engine = None
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    def instrument(self, engine):
+        self.engine = engine
+        pool = engine.pool
+        event.listen(pool, 'connect', self._on_connect)
+        event.listen(pool, 'checkout', self._on_checkout)
+        event.listen(pool, 'checkin', self._on_checkin)
+        event.listen(pool, 'invalidate', self._on_invalidate)
+
+        # Pool không có event cho thời gian chờ, nên bọc hàm lấy kết nối của pool
+        do_get = getattr(pool, '_do_get', None)
+        if do_get is not None:
+            def timed_do_get():
+                started = time.perf_counter()
+                try:
+                    return do_get()
+                except exc.TimeoutError:
+                    with self._lock:
+                        self.timeouts += 1
+                    raise
+                finally:
+                    self._record_wait((time.perf_counter() - started) * 1000)
+            pool._do_get = timed_do_get
+        return self
+
+    def _record_wait(self, waited_ms):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total_ms += waited_ms
+            if waited_ms > self.wait_max_ms:
+                self.wait_max_ms = waited_ms
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self):
+        pool = self.engine.pool if self.engine is not None else None
+        data = {'pool_class': type(pool).__name__ if pool is not None else None}
+        for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+            method = getattr(pool, name, None)
+            data[name] = method() if callable(method) else None
+        with self._lock:
+            data.update({
+                'total_checkouts': self.checkouts,
+                'total_checkins': self.checkins,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'timeouts': self.timeouts,
+                'wait_count': self.wait_count,
+                'wait_avg_ms': round(self.wait_total_ms / self.wait_count, 3) if self.wait_count else 0,
+                'wait_max_ms': round(self.wait_max_ms, 3),
+            })
+        return data
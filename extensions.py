@@ -0,0 +1,11 @@
+"""Các extension dùng chung, được gắn vào app trong create_app()"""
+from flask_sqlalchemy import SQLAlchemy
+
+from db_pool import PoolStats
+from query_profiler import QueryProfiler
+
+db = SQLAlchemy()
+
+# Đếm câu SQL / thời gian DB theo request, cảnh báo N+1 và câu SQL chậm
+query_profiler = QueryProfiler()
+pool_stats = PoolStats()
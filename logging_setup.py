@@ -0,0 +1,109 @@
+"""
+Logging có cấu trúc (JSON) và không chặn request.
+
+Các handler chỉ đưa record vào hàng đợi (QueueHandler); một thread riêng (QueueListener)
+mới định dạng và ghi ra stdout, nên request không phải chờ ghi I/O.
+Mỗi dòng log kèm request_id, route, method, path của request hiện tại.
+"""
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+LOGGER_NAME = 'muongthanh'
+
+_listener = None
+
+# Thuộc tính chuẩn của LogRecord, phần còn lại (truyền qua extra=) được đưa vào JSON
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class RequestContextFilter(logging.Filter):
+    """Gắn thông tin request vào record (chạy ở thread gọi log, trước khi vào hàng đợi)"""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get('request_id')
+            record.route = request.endpoint
+            record.method = request.method
+            record.path = request.path
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _StructuredQueueHandler(QueueHandler):
+    """Giữ nguyên các field extra; chỉ gộp args và chuyển exception thành text trước khi vào hàng đợi"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(app):
+    """Cấu hình logger 'muongthanh' (JSON qua hàng đợi) và log truy cập kèm thời gian xử lý"""
+    global _listener
+    app.config.setdefault('LOG_LEVEL', 'INFO')
+    app.config.setdefault('LOG_REQUESTS', True)
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(app.config['LOG_LEVEL'])
+    logger.propagate = False
+
+    if _listener is None:
+        log_queue = queue.SimpleQueue()
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(JsonFormatter())
+        _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        handler = _StructuredQueueHandler(log_queue)
+        handler.addFilter(RequestContextFilter())
+        logger.addHandler(handler)
+
+    @app.before_request
+    def _start_request_log():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _finish_request_log(response):
+        response.headers['X-Request-ID'] = g.get('request_id', '')
+        if app.config['LOG_REQUESTS'] and 'request_started' in g:
+            logger.info('request', extra={
+                'status': response.status_code,
+                'duration_ms': round((time.perf_counter() - g.request_started) * 1000, 2),
+            })
+        return response
+
+    return logger
@@ -0,0 +1,320 @@
+"""Các model SQLAlchemy của hệ thống đặt phòng"""
+from datetime import datetime
+
+from extensions import db
+
+# ===== DATABASE MODELS =====
+
+
+class Review(db.Model):
+    __tablename__ = 'reviews'
+    __table_args__ = (
+        # admin_reviews (lọc theo status, mới nhất trước) và room_detail (theo phòng)
+        db.Index('ix_reviews_status_created', 'status', 'created_at'),
+        db.Index('ix_reviews_room_status', 'room_id', 'status'),
+        {'extend_existing': True},
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # OK: rooms.id
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False) 
+    booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'), nullable=False, unique=True)
+    
+    rating = db.Column(db.Integer, nullable=False) 
+    comment = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+
+    # Đã thêm cột status để khắc phục lỗi InvalidRequestError
+    # Trạng thái: 'pending' (chờ duyệt), 'approved' (đã duyệt), 'rejected' (bị từ chối)
+    status = db.Column(db.String(20), default='pending', nullable=False) 
+
+    admin_reply = db.Column(db.Text) 
+    reply_at = db.Column(db.DateTime) 
+    
+    room = db.relationship('Room', backref=db.backref('room_reviews', lazy=True))
+    user = db.relationship('User', backref=db.backref('user_reviews', lazy=True)) 
+    booking = db.relationship('Booking', backref=db.backref('review', uselist=False))
+# ----- User Model -----
+class User(db.Model):
+    # Khai báo tên bảng rõ ràng
+    __tablename__ = 'user' 
+    id = db.Column(db.Integer, primary_key=True)
+    full_name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password = db.Column(db.String(255), nullable=False)
+    phone = db.Column(db.String(20))
+    address = db.Column(db.String(255))
+    role = db.Column(db.String(20), default='customer') # customer, admin, partner
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    # FIX: Xóa quan hệ reviews vì đã định nghĩa backref trong Review
+    bookings = db.relationship('Booking', backref='user', lazy=True)
+    # OLD: reviews = db.relationship('Review', backref='user', lazy=True)
+    
+    def __repr__(self):
+        return f'<User {self.email}>'
+
+
+# ----- Location Model -----
+class Location(db.Model):
+    __tablename__ = 'locations'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    city = db.Column(db.String(100))
+    description = db.Column(db.Text)
+    image = db.Column(db.String(255))
+    
+    # Relationships
+    hotels = db.relationship('Hotel', backref='location', lazy=True)
+    
+    def __repr__(self):
+        return f'<Location {self.name}>'
+
+
+# ----- Hotel Model -----
+class Hotel(db.Model):
+    __tablename__ = 'hotels'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)
+    location_id = db.Column(db.Integer, db.ForeignKey('locations.id'), nullable=False)
+    address = db.Column(db.String(255))
+    phone = db.Column(db.String(20))
+    email = db.Column(db.String(120))
+    description = db.Column(db.Text)
+    facilities = db.Column(db.Text)  # JSON string
+    image = db.Column(db.String(255))
+    rating = db.Column(db.Float, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    rooms = db.relationship('Room', backref='hotel', lazy=True)
+    
+    def __repr__(self):
+        return f'<Hotel {self.name}>'
+
+
+# ----- Room Model -----
+class Room(db.Model):
+    __tablename__ = 'rooms'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    hotel_id = db.Column(db.Integer, db.ForeignKey('hotels.id'), nullable=False)
+    room_number = db.Column(db.String(20), nullable=False)
+    room_type = db.Column(db.String(50), nullable=False)  # Standard, Deluxe, Suite, etc.
+    price = db.Column(db.Float, nullable=False)
+    max_people = db.Column(db.Integer, default=2)
+    size = db.Column(db.Float)  # m2
+    description = db.Column(db.Text)
+    amenities = db.Column(db.Text)  # JSON string
+    image = db.Column(db.String(255))
+    status = db.Column(db.String(20), default='available')  # available, occupied, maintenance
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    floor = db.Column(db.Integer, default=1)
+    # Relationships
+    bookings = db.relationship('Booking', backref='room', lazy=True)
+    # FIX: Xóa quan hệ reviews vì đã định nghĩa backref trong Review
+    # OLD: reviews = db.relationship('Review', backref='room', lazy=True)
+    
+    def __repr__(self):
+        return f'<Room {self.room_number} - {self.room_type}>'
+    
+    def is_available(self, check_in, check_out):
+        """Kiểm tra phòng có available trong khoảng thời gian không"""
+        from booking_service import is_room_available
+        return is_room_available(self.id, check_in, check_out)
+
+
+# ----- Booking Model -----
+class Booking(db.Model):
+    __tablename__ = 'bookings'
+    __table_args__ = (
+        # Kiểm tra trùng lịch / sơ đồ phòng
+        db.Index('ix_bookings_room_status_dates', 'room_id', 'status', 'check_in', 'check_out'),
+        # Thống kê doanh thu theo ngày tạo
+        db.Index('ix_bookings_payment_created', 'payment_status', 'created_at'),
+        # my_bookings / my_account
+        db.Index('ix_bookings_user_created', 'user_id', 'created_at'),
+        # Job hoàn thành booking đã qua check-out
+        db.Index('ix_bookings_status_checkout', 'status', 'check_out'),
+        # Phân trang keyset trang admin bookings
+        db.Index('ix_bookings_created_id', 'created_at', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # FIX: Đã sửa từ 'users.id' thành 'user.id'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)  # Nullable cho guest booking
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False)
+    
+    # Guest info
+    guest_name = db.Column(db.String(100), nullable=False)
+    guest_phone = db.Column(db.String(20), nullable=False)
+    guest_address = db.Column(db.String(200))
+    
+    # Booking details
+    check_in = db.Column(db.DateTime, nullable=False)
+    check_out = db.Column(db.DateTime, nullable=False)
+    adults = db.Column(db.Integer, default=1)
+    children = db.Column(db.Integer, default=0)
+    total_price = db.Column(db.Float, nullable=False)
+    
+    # Payment
+    payment_method = db.Column(db.String(50))  # momo, vnpay, zalopay, banking
+    payment_status = db.Column(db.String(20), default='unpaid')  # unpaid, pending, paid, failed
+    
+    # Status
+    status = db.Column(db.String(20), default="reserved") # pending, confirmed, cancelled, completed
+    
+    # Additional
+    promotion_code = db.Column(db.String(50))
+    special_requests = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    # FIX: Xóa quan hệ reviews vì đã định nghĩa backref trong Review
+    # OLD: reviews = db.relationship('Review', backref='booking', lazy=True)
+    
+    def __repr__(self):
+        return f'<Booking #{self.id} - Room {self.room_id}>'
+    
+    @property
+    def nights(self):
+        """Tính số đêm"""
+        return (self.check_out - self.check_in).days
+
+
+# ----- Promotion Model -----
+class Promotion(db.Model):
+    __tablename__ = 'promotions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    code = db.Column(db.String(50), unique=True, nullable=False)
+    description = db.Column(db.Text)
+    discount_percent = db.Column(db.Float, nullable=False)
+    min_amount = db.Column(db.Float, default=0)
+    max_uses = db.Column(db.Integer)  # Null = unlimited
+    current_uses = db.Column(db.Integer, default=0)
+    start_date = db.Column(db.DateTime, nullable=False)
+    end_date = db.Column(db.DateTime, nullable=False)
+    active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Promotion {self.code} - {self.discount_percent}%>'
+    
+    def is_valid(self):
+        """Kiểm tra mã có còn hợp lệ không (qua cache mã khuyến mãi, xem promotions.quote)"""
+        from promotions import quote
+        return quote(self.code).valid
+
+
+# ----- Rate Rule Model -----
+class RateRule(db.Model):
+    """
+    Quy tắc giá theo đêm cho một loại phòng (room_type NULL = mọi loại phòng), xem pricing.py.
+    kind: 'weekend' (đêm thứ 6, thứ 7), 'season' (các đêm trong start_date..end_date),
+    'long_stay' (cả kỳ ở từ min_nights đêm). adjust_percent: 20 = tăng 20%, -10 = giảm 10%.
+    """
+    __tablename__ = 'rate_rules'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    room_type = db.Column(db.String(50))
+    kind = db.Column(db.String(20), nullable=False)
+    adjust_percent = db.Column(db.Float, nullable=False)
+    start_date = db.Column(db.Date)
+    end_date = db.Column(db.Date)
+    min_nights = db.Column(db.Integer)
+    active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<RateRule {self.name} {self.kind} {self.adjust_percent:+g}%>'
+
+
+# ----- Service Model (Optional) -----
+class Service(db.Model):
+    __tablename__ = 'services'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text)
+    price = db.Column(db.Float, nullable=False)
+    icon = db.Column(db.String(50))  # Font awesome icon class
+    active = db.Column(db.Boolean, default=True)
+    
+    def __repr__(self):
+        return f'<Service {self.name}>'
+
+
+# ----- Daily Revenue Rollup -----
+class DailyRevenue(db.Model):
+    """
+    Bảng tổng hợp doanh thu theo ngày, được cập nhật tăng dần khi booking thay đổi.
+    date_basis: 'created' (ngày tạo booking) hoặc 'check_in' (ngày nhận phòng).
+    """
+    __tablename__ = 'daily_revenue'
+    __table_args__ = (
+        db.UniqueConstraint('day', 'date_basis', 'status', 'payment_status', 'payment_method',
+                            name='uq_daily_revenue_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    date_basis = db.Column(db.String(10), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='')
+    payment_status = db.Column(db.String(20), nullable=False, default='')
+    payment_method = db.Column(db.String(50), nullable=False, default='')  # '' = chưa chọn
+    booking_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<DailyRevenue {self.day} {self.date_basis} {self.status}/{self.payment_status}>'
+
+
+# ----- Review Stats -----
+class ReviewStats(db.Model):
+    """
+    Tổng hợp đánh giá theo phòng (scope='room'), khách sạn ('hotel') và toàn hệ thống ('all', scope_id=0),
+    được cập nhật tăng dần khi review thay đổi (xem review_stats.py).
+    Số lượng đếm theo trạng thái; tổng điểm và phân bố sao chỉ tính review đã duyệt.
+    """
+    __tablename__ = 'review_stats'
+    __table_args__ = (
+        db.UniqueConstraint('scope', 'scope_id', name='uq_review_stats_scope'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String(10), nullable=False)
+    scope_id = db.Column(db.Integer, nullable=False)
+    pending_count = db.Column(db.Integer, nullable=False, default=0)
+    approved_count = db.Column(db.Integer, nullable=False, default=0)
+    rejected_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    star_1 = db.Column(db.Integer, nullable=False, default=0)
+    star_2 = db.Column(db.Integer, nullable=False, default=0)
+    star_3 = db.Column(db.Integer, nullable=False, default=0)
+    star_4 = db.Column(db.Integer, nullable=False, default=0)
+    star_5 = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ReviewStats {self.scope}:{self.scope_id} {self.approved_count} đã duyệt>'
+
+    @property
+    def total(self):
+        return self.pending_count + self.approved_count + self.rejected_count
+
+    @property
+    def average(self):
+        """Điểm trung bình của các review đã duyệt (0 nếu chưa có)"""
+        return self.rating_sum / self.approved_count if self.approved_count else 0
+
+    @property
+    def distribution(self):
+        """{số sao: số review đã duyệt}, 5 sao trước"""
+        return {stars: getattr(self, f'star_{stars}') for stars in range(5, 0, -1)}
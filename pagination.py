@@ -0,0 +1,81 @@
+"""
+Phân trang keyset (seek) dùng chung cho các danh sách lớn: booking của khách, booking trong
+trang admin, review của phòng và trang quản lý đánh giá.
+
+Danh sách được sắp xếp giảm dần theo các cột truyền vào (cột cuối phải duy nhất, thường là id).
+Trang sau lọc "nhỏ hơn giá trị của dòng cuối trang trước" thay vì OFFSET, nên mỗi trang là một câu
+SQL có giới hạn dù đang ở trang thứ mấy. Cursor trên URL có dạng '<giá trị 1>_<giá trị 2>...',
+ví dụ '2025-06-01T10:00:00_42'.
+
+Giá trị NULL (ví dụ created_at của dữ liệu cũ) luôn xếp sau mọi giá trị khác, trên mọi DB, và được ghi
+trong cursor là chuỗi rỗng ('_42'), nên các dòng này vẫn được phân trang tiếp thay vì quay về trang đầu.
+"""
+from datetime import date, datetime
+
+from sqlalchemy import and_, or_
+
+from extensions import db
+
+
+class KeysetPager:
+    """Phân trang keyset theo các cột sắp xếp giảm dần, ví dụ KeysetPager(Booking.created_at, Booking.id)"""
+
+    def __init__(self, *columns):
+        self.columns = columns
+
+    def cursor(self, item):
+        """Cursor của dòng cuối trang"""
+        values = (getattr(item, column.key) for column in self.columns)
+        return '_'.join('' if value is None else value.isoformat() if isinstance(value, date) else str(value)
+                        for value in values)
+
+    def parse(self, value):
+        """Cursor trên URL -> tuple giá trị theo từng cột, None nếu không có hoặc không hợp lệ"""
+        if not value:
+            return None
+        parts = value.rsplit('_', len(self.columns) - 1)
+        if len(parts) != len(self.columns):
+            return None
+        try:
+            return tuple(self._parse_value(column, part) for column, part in zip(self.columns, parts))
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _parse_value(column, value):
+        if value == '':
+            return None
+        python_type = column.type.python_type
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        return python_type(value)
+
+    def page(self, query, cursor, per_page):
+        """
+        Một trang (giảm dần theo các cột) bắt đầu sau cursor đã parse (None = trang đầu).
+        Trả về (items, next_cursor); next_cursor là None nếu đây là trang cuối.
+        """
+        if cursor is not None:
+            # (c1, c2, ...) < (v1, v2, ...) viết dạng OR/AND để chạy được trên mọi DB; NULL nhỏ hơn mọi giá trị
+            conditions = []
+            for i, (column, value) in enumerate(zip(self.columns, cursor)):
+                if value is None:
+                    continue
+                equal = [c.is_(None) if v is None else c == v for c, v in zip(self.columns[:i], cursor[:i])]
+                smaller = or_(column < value, column.is_(None)) if column.expression.nullable else column < value
+                conditions.append(and_(*equal, smaller))
+            query = query.filter(or_(*conditions))
+        rows = query.order_by(*(self._descending(column) for column in self.columns)).limit(per_page + 1).all()
+        items = rows[:per_page]
+        next_cursor = self.cursor(items[-1]) if len(rows) > per_page else None
+        return items, next_cursor
+
+    @staticmethod
+    def _descending(column):
+        # PostgreSQL xếp NULL trước khi DESC; SQLite, MySQL, SQL Server đã xếp NULL sau (và MySQL,
+        # SQL Server không hiểu NULLS LAST)
+        if column.expression.nullable and db.engine.dialect.name == 'postgresql':
+            return column.desc().nulls_last()
+        return column.desc()
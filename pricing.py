@@ -0,0 +1,150 @@
+"""
+Tính giá phòng theo từng đêm.
+
+Giá một đêm = room.price × hệ số của đêm đó. Hệ số lấy từ các RateRule đang bật (cuối tuần, theo
+mùa) áp cho loại phòng; quy tắc 'long_stay' giảm giá cả kỳ ở khi đủ số đêm.
+
+Hệ số được tính sẵn thành lịch PRICING_HORIZON_DAYS ngày kể từ hôm nay, lưu dạng tổng cộng dồn cho
+từng loại phòng. Tổng một kỳ ở chỉ là hiệu hai phần tử của mảng cộng dồn (không lặp theo đêm), và
+báo giá nhiều phòng một lúc (trang /search) chỉ tính một lần cho mỗi loại phòng.
+"""
+from datetime import date, timedelta
+from itertools import accumulate
+from types import SimpleNamespace
+
+from cache import TTLCache
+from extensions import db
+from models import RateRule
+from reporting import as_date
+
+# weekday() của các đêm tính giá cuối tuần: đêm thứ 6 và đêm thứ 7
+WEEKEND_NIGHTS = (4, 5)
+NIGHTLY_KINDS = ('weekend', 'season')
+
+RULE_FIELDS = ('id', 'name', 'room_type', 'kind', 'adjust_percent', 'start_date', 'end_date',
+               'min_nights')
+
+pricing_cache = TTLCache(default_ttl=300)
+_CALENDAR_KEY = 'pricing:calendar'
+horizon_days = 730
+
+
+class RateCalendar:
+    """Lịch hệ số giá theo đêm cho các loại phòng, bắt đầu từ ngày `start`"""
+
+    def __init__(self, start, days, rules):
+        self.start = start
+        self.days = days
+        self.rules = rules
+        self._cumulative = {}   # room_type -> [0, f0, f0+f1, ...]
+
+    def _rules_for(self, room_type, kinds):
+        return [r for r in self.rules
+                if r.kind in kinds and (r.room_type is None or r.room_type == room_type)]
+
+    @staticmethod
+    def _night_factor(day, rules):
+        factor = 1.0
+        for rule in rules:
+            if rule.kind == 'weekend':
+                applies = day.weekday() in WEEKEND_NIGHTS
+            else:
+                applies = (rule.start_date is None or rule.start_date <= day) and \
+                    (rule.end_date is None or day <= rule.end_date)
+            if applies:
+                factor *= 1 + rule.adjust_percent / 100
+        return factor
+
+    def _cumulative_for(self, room_type):
+        cumulative = self._cumulative.get(room_type)
+        if cumulative is None:
+            rules = self._rules_for(room_type, NIGHTLY_KINDS)
+            factors = (self._night_factor(self.start + timedelta(days=i), rules) for i in range(self.days))
+            cumulative = self._cumulative[room_type] = list(accumulate(factors, initial=0.0))
+        return cumulative
+
+    def stay_factor(self, room_type, check_in, check_out):
+        """Tổng hệ số các đêm check_in..check_out-1 (kể cả giảm giá ở dài ngày)"""
+        first = (check_in - self.start).days
+        last = (check_out - self.start).days
+        nights = last - first
+        if nights <= 0:
+            return 0.0
+        if 0 <= first and last <= self.days:
+            cumulative = self._cumulative_for(room_type)
+            total = cumulative[last] - cumulative[first]
+        else:
+            # Kỳ ở nằm ngoài lịch tính sẵn (quá khứ hoặc quá xa): tính từng đêm
+            rules = self._rules_for(room_type, NIGHTLY_KINDS)
+            total = sum(self._night_factor(check_in + timedelta(days=i), rules) for i in range(nights))
+
+        long_stay = [r.adjust_percent for r in self._rules_for(room_type, ('long_stay',))
+                     if nights >= (r.min_nights or 0)]
+        if long_stay:
+            total *= 1 + min(long_stay) / 100
+        return total
+
+
+def _build_calendar():
+    rules = [SimpleNamespace(**{field: getattr(r, field) for field in RULE_FIELDS})
+             for r in RateRule.query.filter(RateRule.active == True).all()]
+    return RateCalendar(date.today(), horizon_days, rules)
+
+
+def get_rate_calendar():
+    """Lịch giá hiện tại, nạp lại khi hết PRICING_CACHE_TTL, khi sang ngày mới hoặc khi RateRule đổi"""
+    calendar = pricing_cache.get_or_set(_CALENDAR_KEY, _build_calendar)
+    if calendar.start != date.today():
+        invalidate_rate_calendar()
+        calendar = pricing_cache.get_or_set(_CALENDAR_KEY, _build_calendar)
+    return calendar
+
+
+def invalidate_rate_calendar():
+    pricing_cache.invalidate(_CALENDAR_KEY)
+
+
+def quote_rooms(rooms, check_in, check_out):
+    """
+    Báo giá cùng một kỳ ở cho nhiều phòng (ORM hoặc SimpleNamespace có id, room_type, price).
+    Trả về dict room_id -> SimpleNamespace(nights, base_total, total, nightly_average).
+    """
+    check_in, check_out = as_date(check_in), as_date(check_out)
+    nights = max((check_out - check_in).days, 0)
+    calendar = get_rate_calendar()
+    factors = {}
+    quotes = {}
+    for room in rooms:
+        room_type = getattr(room, 'room_type', None)
+        if room_type not in factors:
+            factors[room_type] = calendar.stay_factor(room_type, check_in, check_out)
+        price = getattr(room, 'price', 0) or 0
+        total = round(price * factors[room_type])
+        quotes[room.id] = SimpleNamespace(
+            nights=nights, base_total=price * nights, total=total,
+            nightly_average=total / nights if nights else 0,
+        )
+    return quotes
+
+
+def quote_stay(room, check_in, check_out):
+    """Báo giá một phòng cho kỳ ở check_in..check_out"""
+    return quote_rooms([room], check_in, check_out)[room.id]
+
+
+# ===== XÓA CACHE KHI QUY TẮC GIÁ THAY ĐỔI =====
+@db.event.listens_for(db.session, 'after_flush')
+def _collect_rate_rule_changes(session, flush_context):
+    if any(isinstance(obj, RateRule) for obj in list(session.new) + list(session.dirty) + list(session.deleted)):
+        session.info['rate_rules_changed'] = True
+
+
+@db.event.listens_for(db.session, 'after_commit')
+def _invalidate_rate_rule_changes(session):
+    if session.info.pop('rate_rules_changed', False):
+        invalidate_rate_calendar()
+
+
+@db.event.listens_for(db.session, 'after_rollback')
+def _discard_rate_rule_changes(session):
+    session.info.pop('rate_rules_changed', None)
@@ -0,0 +1,162 @@
+"""
+Tra cứu, tính giảm giá và sử dụng mã khuyến mãi.
+
+Các mã đang hoạt động được giữ trong cache của process (key = code), nạp lại sau PROMO_CACHE_TTL
+giây hoặc khi admin thêm/sửa/bật tắt/xóa mã. Mọi nơi cần kiểm tra mã đều gọi quote(). current_uses
+trong cache có thể cũ vài giây: quote() chỉ dùng để báo trước cho khách, lượt dùng thật vẫn do
+redeem_promotion() quyết định.
+
+Lượt dùng được trừ bằng một câu UPDATE có điều kiện (không đọc rồi ghi), nên số lượt không thể
+vượt max_uses dù nhiều request cùng dùng một mã. Mỗi process có thêm một token bucket cho từng mã
+để chặn bớt request dồn vào cùng một dòng promotions khi mã đang "hot": request bị chặn
+(admit_redemption() trả về False) không tạo booking, khách được báo thử lại (không tự đổi sang giá gốc).
+"""
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from flask import current_app
+from sqlalchemy import func, or_
+
+from cache import TTLCache
+from extensions import db
+from models import Promotion
+
+PROMOTION_FIELDS = ('id', 'code', 'description', 'discount_percent', 'min_amount', 'max_uses',
+                    'current_uses', 'start_date', 'end_date')
+
+
+class PromotionUnavailableError(Exception):
+    """Mã khuyến mãi đã hết lượt hoặc hết hạn"""
+
+
+class TokenBucket:
+    """Cho phép tối đa `rate` lượt/giây, dồn được tối đa `capacity` lượt (thread-safe)"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens=1):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+
+promotion_cache = TTLCache()
+_ACTIVE_KEY = 'promotions:active'
+
+
+def _load_active_promotions():
+    """Nạp một lần tất cả mã đang bật và chưa hết hạn, key = code"""
+    rows = Promotion.query.filter(Promotion.active == True, Promotion.end_date >= datetime.now()).all()
+    return {
+        p.code: SimpleNamespace(**{field: getattr(p, field) for field in PROMOTION_FIELDS})
+        for p in rows
+    }
+
+
+def active_promotions():
+    """Dict code -> promotion (SimpleNamespace) của các mã đang bật, lấy từ cache"""
+    return promotion_cache.get_or_set(_ACTIVE_KEY, _load_active_promotions)
+
+
+def invalidate_promotions():
+    """Gọi sau khi admin thay đổi mã khuyến mãi"""
+    promotion_cache.invalidate(_ACTIVE_KEY)
+
+
+def promotions_in_effect(now=None):
+    """Các mã đang trong thời gian hiệu lực, giảm nhiều nhất trước (trang /promotions)"""
+    now = now or datetime.now()
+    return sorted(
+        (p for p in active_promotions().values() if p.start_date <= now <= p.end_date),
+        key=lambda p: p.discount_percent, reverse=True,
+    )
+
+
+def quote(code, amount=None, now=None):
+    """
+    Kiểm tra mã và tính tiền giảm cho đơn `amount` (None = bỏ qua điều kiện đơn tối thiểu).
+    Trả về SimpleNamespace: valid, reason (None/'not_found'/'expired'/'exhausted'/'min_amount'),
+    message (thông báo cho khách, None nếu không cần báo), promotion, discount, total.
+    """
+    now = now or datetime.now()
+    promo = active_promotions().get(code) if code else None
+    reason = message = None
+    if promo is None:
+        reason = 'not_found'
+    elif not promo.start_date <= now <= promo.end_date:
+        reason = 'expired'
+    elif promo.max_uses is not None and (promo.current_uses or 0) >= promo.max_uses:
+        reason, message = 'exhausted', 'Mã giảm giá đã hết lượt sử dụng'
+    elif amount is not None and amount < (promo.min_amount or 0):
+        reason = 'min_amount'
+        message = f'Đơn hàng tối thiểu {promo.min_amount:,.0f}đ để sử dụng mã giảm giá này'
+
+    discount = 0
+    if reason is None and amount is not None:
+        discount = amount * (promo.discount_percent / 100)
+    return SimpleNamespace(
+        code=code, valid=reason is None, reason=reason, message=message, promotion=promo,
+        discount=discount, total=None if amount is None else amount - discount,
+    )
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def _bucket_for(promotion_id):
+    """Token bucket của mã, None nếu PROMO_REDEEM_RATE = 0 (tắt giới hạn)"""
+    rate = current_app.config['PROMO_REDEEM_RATE']
+    if not rate:
+        return None
+    bucket = _buckets.get(promotion_id)
+    if bucket is None:
+        with _buckets_lock:
+            bucket = _buckets.setdefault(
+                promotion_id, TokenBucket(rate, current_app.config['PROMO_REDEEM_BURST']))
+    return bucket
+
+
+def admit_redemption(promotion_id):
+    """
+    True nếu token bucket của mã cho dùng thêm một lượt lúc này (luôn True khi tắt giới hạn).
+    Gọi trước khi áp dụng mã cho booking: bị từ chối thì không tạo booking và không gọi redeem_promotion().
+    """
+    bucket = _bucket_for(promotion_id)
+    return bucket is None or bucket.try_acquire()
+
+
+def redeem_promotion(promotion_id, now=None):
+    """
+    Dùng một lượt của mã trong transaction hiện tại (người gọi commit/rollback).
+    Trả về False nếu mã hết lượt hoặc không còn hiệu lực.
+    """
+    now = now or datetime.now()
+    promotions = Promotion.__table__
+    current_uses = func.coalesce(promotions.c.current_uses, 0)
+    result = db.session.execute(
+        promotions.update().where(
+            promotions.c.id == promotion_id,
+            promotions.c.active == True,
+            promotions.c.start_date <= now,
+            promotions.c.end_date >= now,
+            or_(promotions.c.max_uses.is_(None), current_uses < promotions.c.max_uses),
+        ).values(current_uses=current_uses + 1)
+    )
+    if result.rowcount == 1:
+        return True
+    # Mã vừa hết lượt/hết hạn: bỏ cache để quote() của các request sau thấy ngay
+    invalidate_promotions()
+    return False
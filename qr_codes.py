@@ -0,0 +1,82 @@
+"""
+Sinh ảnh QR (PNG) cho booking.
+
+qrcode/PIL chỉ được import khi thực sự tạo ảnh, nên worker không phục vụ trang thanh toán
+không phải nạp các thư viện này lúc khởi động.
+"""
+import hashlib
+import importlib.util
+import io
+import logging
+import os
+from functools import lru_cache
+
+logger = logging.getLogger('muongthanh')
+
+# Kiểm tra thư viện có cài hay không mà không import (rẻ hơn nhiều so với import qrcode + PIL)
+QR_AVAILABLE = importlib.util.find_spec('qrcode') is not None
+
+# Số QR (PNG) giữ trong LRU cache của mỗi process; QR_CACHE_DIR (tùy chọn) lưu thêm ra đĩa
+QR_CACHE_SIZE = int(os.environ.get('QR_CACHE_SIZE', 1024))
+QR_CACHE_DIR = os.environ.get('QR_CACHE_DIR')
+
+
+def generate_qr_png(payload: str):
+    """Return PNG bytes for the given payload (cached per payload), or None if failed/not available."""
+    if not QR_AVAILABLE:
+        return None
+    try:
+        return _render_qr_png(payload)
+    except Exception:
+        # Lỗi không được lưu vào cache: request sau sẽ thử tạo lại
+        logger.exception("QR generation failed")
+        return None
+
+
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def _render_qr_png(payload: str):
+    """PNG của payload (đọc từ QR_CACHE_DIR nếu có); raise nếu không tạo được ảnh"""
+    disk_path = None
+    if QR_CACHE_DIR:
+        disk_path = os.path.join(QR_CACHE_DIR, hashlib.sha256(payload.encode('utf-8')).hexdigest() + '.png')
+        try:
+            with open(disk_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            pass
+
+    import qrcode  # import lần đầu khi tạo ảnh (kéo theo PIL)
+
+    # Tăng kích thước QR code (ví dụ: box_size=5, border=4)
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=5,
+        border=4,
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+    
+    img = qr.make_image(fill_color="black", back_color="white")
+    
+    buf = io.BytesIO()
+    img.save(buf, format='PNG')
+    png = buf.getvalue()
+
+    if disk_path:
+        try:
+            os.makedirs(QR_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{disk_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(png)
+            os.replace(tmp_path, disk_path)
+        except OSError:
+            logger.exception("QR disk cache write failed")
+    return png
+
+
+def booking_qr_payload(booking, kind='payment'):
+    """Nội dung QR của booking: 'payment' (chuyển khoản) hoặc 'checkin' (xác nhận tại quầy)"""
+    if kind == 'checkin':
+        return f"MUONGTHANH{booking.id};ROOM:{booking.room_id}"
+    return f"MUONGTHANH{booking.id}"
@@ -0,0 +1,107 @@
+"""
+Đếm câu SQL và thời gian DB theo từng request, phát hiện N+1 và log câu SQL chậm.
+
+Dựa trên event before_cursor_execute / after_cursor_execute của SQLAlchemy.
+- Debug mode: kết quả gửi về qua header X-Query-Count, X-Query-Time-Ms, X-N-Plus-One.
+- Production: ghi một dòng log có cấu trúc cho mỗi request (logger 'muongthanh.sql').
+"""
+import logging
+import re
+import time
+from collections import Counter
+
+from flask import g, has_request_context
+from sqlalchemy import event
+
+logger = logging.getLogger('muongthanh.sql')
+
+# Gom literal, placeholder và "IN (?, ?, ?)" để các câu cùng dạng có cùng shape
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|(?<![:\w]):\w+')
+_NUMBER = re.compile(r'\b\d+\b')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACES = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    """Chuẩn hóa câu SQL để nhận ra các câu lặp lại chỉ khác tham số"""
+    shape = _STRING.sub('?', statement)
+    shape = _PLACEHOLDER.sub('?', shape)
+    shape = _NUMBER.sub('?', shape)
+    shape = _IN_LIST.sub('(?)', shape)
+    return _SPACES.sub(' ', shape).strip()
+
+
+class QueryProfiler:
+    def __init__(self, app=None, engine=None):
+        self.app = app
+        if app is not None and engine is not None:
+            self.init_app(app, engine)
+
+    def init_app(self, app, engine):
+        self.app = app
+        app.config.setdefault('SQL_PROFILER_ENABLED', True)
+        app.config.setdefault('SLOW_QUERY_MS', 200)
+        app.config.setdefault('N_PLUS_ONE_THRESHOLD', 10)
+
+        if not app.config['SQL_PROFILER_ENABLED']:
+            return
+
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    # ----- SQLAlchemy events -----
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info['query_start_time'].pop()) * 1000
+        if not has_request_context() or 'sql_stats' not in g:
+            return
+
+        stats = g.sql_stats
+        stats['count'] += 1
+        stats['time_ms'] += elapsed_ms
+        stats['shapes'][statement_shape(statement)] += 1
+
+        if elapsed_ms >= self.app.config['SLOW_QUERY_MS']:
+            logger.warning('slow_query', extra={
+                'duration_ms': round(elapsed_ms, 2),
+                'statement': _SPACES.sub(' ', statement)[:2000],
+            })
+
+    # ----- Flask hooks -----
+
+    def _start_request(self):
+        g.sql_stats = {'count': 0, 'time_ms': 0.0, 'shapes': Counter()}
+
+    def _finish_request(self, response):
+        stats = g.pop('sql_stats', None)
+        if stats is None:
+            return response
+
+        threshold = self.app.config['N_PLUS_ONE_THRESHOLD']
+        repeated = [(shape, n) for shape, n in stats['shapes'].most_common() if n > threshold]
+
+        if self.app.debug:
+            response.headers['X-Query-Count'] = str(stats['count'])
+            response.headers['X-Query-Time-Ms'] = f"{stats['time_ms']:.2f}"
+            if repeated:
+                response.headers['X-N-Plus-One'] = str(len(repeated))
+        else:
+            extra = {
+                'status': response.status_code,
+                'query_count': stats['count'],
+                'query_time_ms': round(stats['time_ms'], 2),
+            }
+            if repeated:
+                extra['n_plus_one'] = [{'count': n, 'statement': shape[:500]} for shape, n in repeated]
+            logger.log(logging.WARNING if repeated else logging.INFO, 'request_sql', extra=extra)
+
+        if repeated and self.app.debug:
+            for shape, n in repeated:
+                logger.warning('n_plus_one', extra={'count': n, 'statement': shape[:500]})
+        return response
@@ -0,0 +1,359 @@
+"""
+Bảng tổng hợp doanh thu theo ngày (daily_revenue), cache KPI của dashboard admin và thống kê
+đặt phòng theo khách hàng.
+
+Cả hai được giữ đúng qua event của session, nên phải được import ở mọi worker
+(kể cả worker không phục vụ trang admin). daily_revenue được cộng trong cùng transaction với thay
+đổi của booking (event after_flush): booking commit thì rollup cũng commit, lỗi thì cả hai rollback.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.exc import IntegrityError
+
+from cache import TTLCache
+from extensions import db
+from models import Booking, DailyRevenue
+
+
+# ===== TỔNG HỢP DOANH THU =====
+# Thứ tự cố định của các cột trong biểu đồ admin/revenue.html
+BOOKING_STATUS_ORDER = ['pending', 'confirmed', 'completed', 'cancelled']
+PAYMENT_METHOD_ORDER = ['momo', 'vnpay', 'zalopay', 'banking']
+
+
+def day_expr(column):
+    """Biểu thức lấy phần ngày của cột DateTime (SQLite không hỗ trợ CAST AS DATE)"""
+    if db.engine.dialect.name == 'sqlite':
+        return func.date(column)
+    return func.cast(column, db.Date)
+
+
+def as_date(value):
+    """datetime, date hoặc chuỗi 'YYYY-MM-DD...' (kết quả DATE() của SQLite) -> date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return datetime.strptime(value[:10], '%Y-%m-%d').date()
+    return value
+
+
+def revenue_by_day(first_day, days):
+    """
+    Doanh thu đã thanh toán theo ngày tạo booking, từ first_day trong `days` ngày.
+    Trả về dict {date: float} đủ mọi ngày (ngày không có doanh thu = 0).
+    """
+    rows = db.session.query(DailyRevenue.day, func.sum(DailyRevenue.revenue)).filter(
+        DailyRevenue.date_basis == 'created',
+        DailyRevenue.payment_status == 'paid',
+        DailyRevenue.day >= first_day,
+        DailyRevenue.day < first_day + timedelta(days=days)
+    ).group_by(DailyRevenue.day).all()
+
+    totals = {as_date(d): float(total or 0) for d, total in rows}
+    series = {}
+    for i in range(days):
+        d = first_day + timedelta(days=i)
+        series[d] = totals.get(d, 0.0)
+    return series
+
+
+def revenue_totals(first_day, last_day):
+    """
+    (doanh thu đã thanh toán, số booking) theo ngày tạo booking từ first_day tới last_day
+    (tính cả hai ngày), đọc từ daily_revenue.
+    """
+    revenue, count = db.session.query(
+        func.sum(case((DailyRevenue.payment_status == 'paid', DailyRevenue.revenue), else_=0)),
+        func.sum(DailyRevenue.booking_count)
+    ).filter(
+        DailyRevenue.date_basis == 'created',
+        DailyRevenue.day >= first_day,
+        DailyRevenue.day <= last_day
+    ).one()
+    return float(revenue or 0), int(count or 0)
+
+
+def booking_status_counts():
+    """Số booking theo trạng thái: {status: count}"""
+    rows = db.session.query(DailyRevenue.status, func.sum(DailyRevenue.booking_count))\
+        .filter(DailyRevenue.date_basis == 'created')\
+        .group_by(DailyRevenue.status).all()
+    return {status: int(count or 0) for status, count in rows}
+
+
+def paid_payment_method_counts():
+    """Số booking đã thanh toán theo phương thức: {payment_method: count}"""
+    rows = db.session.query(DailyRevenue.payment_method, func.sum(DailyRevenue.booking_count))\
+        .filter(DailyRevenue.date_basis == 'created', DailyRevenue.payment_status == 'paid')\
+        .group_by(DailyRevenue.payment_method).all()
+    return {method: int(count or 0) for method, count in rows}
+
+
+def _rollup_keys(check_in, created_at, status, payment_status, payment_method):
+    """Các khóa rollup mà một booking đóng góp vào (một khóa cho mỗi date_basis)"""
+    common = (status or '', payment_status or '', payment_method or '')
+    keys = []
+    if created_at is not None:
+        keys.append((as_date(created_at), 'created') + common)
+    if check_in is not None:
+        keys.append((as_date(check_in), 'check_in') + common)
+    return keys
+
+
+def old_value(state, attr):
+    """Giá trị của thuộc tính trước khi bị thay đổi trong lần flush hiện tại"""
+    history = state.attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(state.object, attr)
+
+
+def track_old_values(*attributes):
+    """
+    Buộc SQLAlchemy nạp giá trị cũ khi gán các thuộc tính này, kể cả khi object đã hết hạn sau
+    commit; nếu không, old_value() trả về giá trị mới và delta của lần sửa đó bằng 0.
+    """
+    for attribute in attributes:
+        db.event.listen(attribute, 'set', lambda *args: None, active_history=True)
+
+
+ROLLUP_TRACKED = ('status', 'payment_status', 'payment_method', 'total_price', 'check_in', 'created_at')
+track_old_values(*(getattr(Booking, attr) for attr in ROLLUP_TRACKED + ('user_id',)))
+
+
+def increment_row(connection, table, keys, increments):
+    """
+    Cộng increments {cột: số} vào dòng có các cột khóa bằng keys; chưa có dòng thì INSERT (cột còn
+    lại lấy default). Nếu transaction khác vừa INSERT cùng khóa (vi phạm unique) thì cộng vào dòng đó
+    thay vì báo lỗi làm hỏng transaction của người gọi.
+    """
+    update = table.update()\
+        .where(and_(*(table.c[column] == value for column, value in keys.items())))\
+        .values(**{column: table.c[column] + value for column, value in increments.items()})
+    if connection.execute(update).rowcount:
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(table.insert().values(**keys, **increments))
+    except IntegrityError:
+        connection.execute(update)
+
+
+def apply_rollup_deltas(connection, deltas):
+    """Cộng dồn deltas {key: [count, revenue]} vào bảng daily_revenue (trong transaction của connection)"""
+    table = DailyRevenue.__table__
+    for key, (count, revenue) in deltas.items():
+        if count == 0 and revenue == 0:
+            continue
+        day, date_basis, status, payment_status, payment_method = key
+        keys = dict(day=day, date_basis=date_basis, status=status,
+                    payment_status=payment_status, payment_method=payment_method)
+        increment_row(connection, table, keys, {'booking_count': count, 'revenue': revenue})
+
+
+@db.event.listens_for(db.session, 'after_flush')
+def _update_revenue_rollup(session, flush_context):
+    """Cộng thay đổi của booking trong lần flush này vào daily_revenue"""
+    deltas = defaultdict(lambda: [0, 0.0])
+
+    def add(keys, sign, total_price):
+        for key in keys:
+            deltas[key][0] += sign
+            deltas[key][1] += sign * float(total_price or 0)
+
+    tracked = ROLLUP_TRACKED
+    for obj in session.new:
+        if isinstance(obj, Booking):
+            add(_rollup_keys(obj.check_in, obj.created_at, obj.status,
+                             obj.payment_status, obj.payment_method), 1, obj.total_price)
+    for obj in session.dirty:
+        if not isinstance(obj, Booking):
+            continue
+        state = db.inspect(obj)
+        if not any(state.attrs[attr].history.has_changes() for attr in tracked):
+            continue
+        old = {attr: old_value(state, attr) for attr in tracked}
+        add(_rollup_keys(old['check_in'], old['created_at'], old['status'],
+                         old['payment_status'], old['payment_method']), -1, old['total_price'])
+        add(_rollup_keys(obj.check_in, obj.created_at, obj.status,
+                         obj.payment_status, obj.payment_method), 1, obj.total_price)
+    for obj in session.deleted:
+        if isinstance(obj, Booking):
+            state = db.inspect(obj)
+            old = {attr: old_value(state, attr) for attr in tracked}
+            add(_rollup_keys(old['check_in'], old['created_at'], old['status'],
+                             old['payment_status'], old['payment_method']), -1, old['total_price'])
+
+    if deltas:
+        apply_rollup_deltas(session.connection(), deltas)
+
+
+def rebuild_revenue_rollup():
+    """Xây lại toàn bộ bảng daily_revenue từ lịch sử bookings"""
+    db.session.query(DailyRevenue).delete()
+    for date_basis, column in (('created', Booking.created_at), ('check_in', Booking.check_in)):
+        day = day_expr(column)
+        rows = db.session.query(
+            day,
+            Booking.status,
+            Booking.payment_status,
+            Booking.payment_method,
+            func.count(Booking.id),
+            func.sum(Booking.total_price)
+        ).group_by(day, Booking.status, Booking.payment_status, Booking.payment_method).all()
+
+        deltas = defaultdict(lambda: [0, 0.0])
+        for d, status, payment_status, payment_method, count, revenue in rows:
+            key = (as_date(d), date_basis, status or '', payment_status or '', payment_method or '')
+            deltas[key][0] += count
+            deltas[key][1] += float(revenue or 0)
+        db.session.bulk_insert_mappings(DailyRevenue, [
+            dict(day=k[0], date_basis=k[1], status=k[2], payment_status=k[3],
+                 payment_method=k[4], booking_count=v[0], revenue=v[1])
+            for k, v in deltas.items()
+        ])
+    db.session.commit()
+
+
+def ensure_revenue_rollup():
+    """
+    Xây daily_revenue nếu bảng còn trống trong khi đã có booking (database có sẵn từ trước khi có
+    bảng rollup), để trang doanh thu và dashboard không hiện toàn số 0. Trả về True nếu đã xây lại.
+    """
+    if DailyRevenue.query.first() is not None or Booking.query.first() is None:
+        return False
+    rebuild_revenue_rollup()
+    return True
+
+
+# ===== CACHE KPI DASHBOARD =====
+# TTL lấy từ DASHBOARD_KPI_TTL khi create_app() khởi tạo
+kpi_cache = TTLCache()
+
+# Model thay đổi -> các KPI cần xóa khỏi cache
+KPI_KEYS_BY_MODEL = {
+    'User': ('total_users',),
+    'Booking': ('total_bookings', 'total_revenue', 'monthly_revenue'),
+    'Room': ('total_rooms',),
+    'Review': ('pending_reviews',),
+}
+
+
+def invalidate_dashboard_kpis(*model_names):
+    """Xóa KPI liên quan tới các model vừa thay đổi (gọi sau khi commit)"""
+    for name in model_names:
+        kpi_cache.invalidate(*KPI_KEYS_BY_MODEL.get(name, ()))
+
+
+@db.event.listens_for(db.session, 'after_flush')
+def _collect_kpi_changes(session, flush_context):
+    changed = session.info.setdefault('kpi_changes', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        name = type(obj).__name__
+        if name in KPI_KEYS_BY_MODEL:
+            changed.add(name)
+
+
+@db.event.listens_for(db.session, 'after_commit')
+def _invalidate_kpi_changes(session):
+    changed = session.info.pop('kpi_changes', None)
+    if changed:
+        invalidate_dashboard_kpis(*changed)
+
+
+@db.event.listens_for(db.session, 'after_rollback')
+def _discard_kpi_changes(session):
+    session.info.pop('kpi_changes', None)
+
+
+# ===== THỐNG KÊ ĐẶT PHÒNG THEO KHÁCH HÀNG =====
+# TTL lấy từ USER_STATS_TTL khi create_app() khởi tạo (0 = không cache)
+user_stats_cache = TTLCache()
+
+
+def _load_user_booking_stats(user_id):
+    completed = Booking.status == 'completed'
+    total, completed_count, cancelled_count, total_spent = db.session.query(
+        func.count(Booking.id),
+        func.sum(case((completed, 1), else_=0)),
+        func.sum(case((Booking.status == 'cancelled', 1), else_=0)),
+        func.sum(case((completed, Booking.total_price), else_=0)),
+    ).filter(Booking.user_id == user_id).one()
+    return {
+        'total_bookings': total or 0,
+        'completed_bookings': int(completed_count or 0),
+        'cancelled_bookings': int(cancelled_count or 0),
+        'total_spent': float(total_spent or 0),  # chỉ tính các booking đã hoàn thành
+    }
+
+
+def user_booking_stats(user_id):
+    """
+    Số booking (tổng/hoàn thành/hủy) và tổng chi tiêu của một khách trong một câu SQL.
+    Dùng cho trang tài khoản và các tính toán theo khách (hạng thành viên...).
+    """
+    if not user_stats_cache.default_ttl:
+        return _load_user_booking_stats(user_id)
+    return user_stats_cache.get_or_set(f'user_stats:{user_id}', lambda: _load_user_booking_stats(user_id))
+
+
+def invalidate_user_stats(*user_ids):
+    """Xóa thống kê của các khách vừa có booking thay đổi; không truyền id = xóa tất cả"""
+    if not user_ids:
+        user_stats_cache.clear()
+        return
+    user_stats_cache.invalidate(*(f'user_stats:{user_id}' for user_id in user_ids))
+
+
+@db.event.listens_for(db.session, 'after_flush')
+def _collect_user_stats_changes(session, flush_context):
+    user_ids = session.info.setdefault('user_stats_changes', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Booking):
+            user_ids.add(obj.user_id)
+            user_ids.add(old_value(db.inspect(obj), 'user_id'))
+
+
+@db.event.listens_for(db.session, 'after_commit')
+def _invalidate_user_stats_changes(session):
+    user_ids = session.info.pop('user_stats_changes', None)
+    if user_ids:
+        invalidate_user_stats(*(user_id for user_id in user_ids if user_id is not None))
+
+
+@db.event.listens_for(db.session, 'after_rollback')
+def _discard_user_stats_changes(session):
+    session.info.pop('user_stats_changes', None)
+
+
+# ===== CẬP NHẬT DASHBOARD ADMIN =====
+def completed_revenue_total():
+    """Tổng doanh thu các booking đã hoàn thành và đã thanh toán (đọc từ rollup)"""
+    revenue = db.session.query(func.sum(DailyRevenue.revenue)).filter(
+        DailyRevenue.date_basis == 'check_in',
+        DailyRevenue.status == 'completed',
+        DailyRevenue.payment_status == 'paid' # Chỉ tính những đơn đã thanh toán
+    ).scalar()
+    return revenue if revenue is not None else 0
+
+
+def completed_revenue_by_month():
+    """Doanh thu theo tháng nhận phòng trong 6 tháng gần nhất: [(year, month, revenue), ...]"""
+    six_months_ago = datetime.now() - timedelta(days=180)
+    
+    daily_rows = db.session.query(DailyRevenue.day, DailyRevenue.revenue).filter(
+        DailyRevenue.date_basis == 'check_in',
+        DailyRevenue.status == 'completed',
+        DailyRevenue.payment_status == 'paid',
+        DailyRevenue.day >= six_months_ago.date()
+    ).all()
+
+    monthly_revenue = defaultdict(float)
+    for day, day_revenue in daily_rows:
+        day = as_date(day)
+        monthly_revenue[(day.year, day.month)] += float(day_revenue or 0)
+    return sorted((year, month, rev) for (year, month), rev in monthly_revenue.items())
@@ -0,0 +1,67 @@
+"""
+Danh sách đánh giá phân trang cho trang chi tiết phòng và trang quản lý đánh giá.
+
+Phân trang keyset theo (created_at, id), mới nhất trước: mỗi trang là một câu SQL có giới hạn
+dù phòng có hàng nghìn đánh giá. Tác giả, phòng và khách sạn được nạp cùng câu SQL.
+Nút "Xem thêm" gọi các endpoint JSON trả về trang tiếp theo (xem review_page_json).
+"""
+from flask import render_template
+from sqlalchemy.orm import joinedload
+
+from models import Review, Room
+from pagination import KeysetPager
+
+REVIEWS_PER_PAGE = 20
+# Review mới nhất trước (created_at, id)
+review_pager = KeysetPager(Review.created_at, Review.id)
+
+
+def review_feed_query(room_id=None, status=None, rating=None, with_room=False):
+    """Query review (kèm tác giả; with_room=True nạp thêm phòng và khách sạn) theo bộ lọc"""
+    options = [joinedload(Review.user)]
+    if with_room:
+        options.append(joinedload(Review.room).joinedload(Room.hotel))
+    query = Review.query.options(*options)
+    if room_id is not None:
+        query = query.filter(Review.room_id == room_id)
+    if status:
+        query = query.filter(Review.status == status)
+    if rating:
+        query = query.filter(Review.rating == rating)
+    return query
+
+
+def review_page(query, cursor, per_page=REVIEWS_PER_PAGE):
+    """Một trang review mới nhất trước. Trả về (reviews, next_cursor), next_cursor None nếu hết"""
+    return review_pager.page(query, cursor, per_page)
+
+
+def review_to_dict(review, with_room=False):
+    data = {
+        'id': review.id,
+        'room_id': review.room_id,
+        'booking_id': review.booking_id,
+        'author': review.user.full_name if review.user else None,
+        'rating': review.rating,
+        'comment': review.comment,
+        'status': review.status,
+        'created_at': review.created_at.isoformat() if review.created_at else None,
+        'admin_reply': review.admin_reply,
+        'reply_at': review.reply_at.isoformat() if review.reply_at else None,
+    }
+    if with_room:
+        data['room'] = {
+            'room_type': review.room.room_type,
+            'room_number': review.room.room_number,
+            'hotel_name': review.room.hotel.name if review.room.hotel else None,
+        }
+    return data
+
+
+def review_page_json(reviews, next_cursor, template, with_room=False):
+    """Dữ liệu JSON cho "Xem thêm": danh sách review, HTML đã render sẵn và cursor trang sau"""
+    return {
+        'reviews': [review_to_dict(review, with_room) for review in reviews],
+        'html': ''.join(render_template(template, review=review) for review in reviews),
+        'next_cursor': next_cursor,
+    }
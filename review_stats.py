@@ -0,0 +1,219 @@
+"""
+Tổng hợp đánh giá theo phòng, khách sạn và toàn hệ thống (bảng review_stats).
+
+Bảng được cập nhật trong cùng transaction với thay đổi của review (event after_flush), nên trang
+chi tiết phòng và trang quản lý đánh giá chỉ đọc một dòng thay vì quét bảng reviews. Hotel.rating
+được đặt lại theo điểm trung bình các review đã duyệt mỗi khi điểm đã duyệt của khách sạn thay đổi
+(về 0 khi không còn review nào được duyệt; khách sạn chưa từng có review được duyệt giữ điểm đã nhập).
+Module phải được import ở mọi worker (create_app() làm việc này).
+
+moderate_reviews() duyệt/từ chối/trả lời nhiều review bằng một câu UPDATE và cộng tổng hợp một lần.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from extensions import db
+from models import Hotel, Review, ReviewStats, Room
+from reporting import increment_row, invalidate_dashboard_kpis, old_value, track_old_values
+
+REVIEW_STATUSES = ('pending', 'approved', 'rejected')
+STAT_COLUMNS = ('pending_count', 'approved_count', 'rejected_count', 'rating_sum',
+                'star_1', 'star_2', 'star_3', 'star_4', 'star_5')
+REVIEW_TRACKED = ('room_id', 'status', 'rating')
+track_old_values(*(getattr(Review, attr) for attr in REVIEW_TRACKED))
+
+
+def get_review_stats(scope, scope_id=0):
+    """Dòng tổng hợp của phòng/khách sạn/toàn hệ thống (toàn số 0 nếu chưa có review)"""
+    stats = ReviewStats.query.filter_by(scope=scope, scope_id=scope_id).first()
+    if stats is None:
+        stats = ReviewStats(scope=scope, scope_id=scope_id, **{column: 0 for column in STAT_COLUMNS})
+    return stats
+
+
+def _contribution(status, rating):
+    """Phần một review đóng góp vào một dòng review_stats"""
+    values = Counter()
+    if status in REVIEW_STATUSES:
+        values[f'{status}_count'] += 1
+    if status == 'approved' and rating and 1 <= rating <= 5:
+        values['rating_sum'] += rating
+        values[f'star_{rating}'] += 1
+    return values
+
+
+def add_review_delta(deltas, room_id, hotel_id, status, rating, weight):
+    """Cộng (weight=1) hoặc trừ (weight=-1) review vào deltas {(scope, scope_id): Counter}"""
+    for key in (('room', room_id), ('hotel', hotel_id), ('all', 0)):
+        if key[1] is None:
+            continue
+        for column, value in _contribution(status, rating).items():
+            deltas[key][column] += weight * value
+
+
+def hotel_ids_for_rooms(connection, room_ids):
+    """{room_id: hotel_id} đọc trực tiếp trên connection (dùng được trong event flush)"""
+    if not room_ids:
+        return {}
+    return dict(connection.execute(select(Room.id, Room.hotel_id).where(Room.id.in_(room_ids))).all())
+
+
+def apply_review_stats_deltas(connection, deltas):
+    """Cộng dồn deltas vào review_stats rồi cập nhật Hotel.rating của các khách sạn liên quan"""
+    table = ReviewStats.__table__
+    hotel_ids = set()
+    for (scope, scope_id), values in deltas.items():
+        values = {column: value for column, value in values.items() if value}
+        if not values:
+            continue
+        # Hai review đầu tiên của cùng phòng/khách sạn đến cùng lúc: increment_row() không để lỗi
+        # unique của dòng tổng hợp làm rollback việc gửi/duyệt review
+        increment_row(connection, table, {'scope': scope, 'scope_id': scope_id}, values)
+        # Chỉ điểm của review đã duyệt ảnh hưởng Hotel.rating (review chờ duyệt thì không)
+        if scope == 'hotel' and ('approved_count' in values or 'rating_sum' in values):
+            hotel_ids.add(scope_id)
+    if hotel_ids:
+        _refresh_hotel_ratings(connection, hotel_ids)
+
+
+def _refresh_hotel_ratings(connection, hotel_ids):
+    """
+    Hotel.rating = điểm trung bình các review đã duyệt, 0 khi review được duyệt cuối cùng bị từ chối
+    hoặc xóa. Chỉ gọi cho khách sạn có điểm đã duyệt vừa thay đổi: khách sạn chưa từng có review
+    được duyệt giữ điểm đã nhập.
+    """
+    table = ReviewStats.__table__
+    hotels = Hotel.__table__
+    rows = connection.execute(
+        select(table.c.scope_id, table.c.rating_sum, table.c.approved_count)
+        .where(table.c.scope == 'hotel', table.c.scope_id.in_(hotel_ids))
+    ).all()
+    for hotel_id, rating_sum, approved_count in rows:
+        rating = round(rating_sum / approved_count, 1) if approved_count else 0
+        connection.execute(hotels.update().where(hotels.c.id == hotel_id).values(rating=rating))
+
+
+@db.event.listens_for(db.session, 'after_flush')
+def _update_review_stats(session, flush_context):
+    """Cập nhật review_stats theo các review được thêm/sửa/xóa trong lần flush này"""
+    changes = []    # (room_id, status, rating, sign)
+    tracked = REVIEW_TRACKED
+    for obj in session.new:
+        if isinstance(obj, Review):
+            changes.append((obj.room_id, obj.status, obj.rating, 1))
+    for obj in session.dirty:
+        if not isinstance(obj, Review):
+            continue
+        state = db.inspect(obj)
+        if not any(state.attrs[attr].history.has_changes() for attr in tracked):
+            continue
+        old = {attr: old_value(state, attr) for attr in tracked}
+        changes.append((old['room_id'], old['status'], old['rating'], -1))
+        changes.append((obj.room_id, obj.status, obj.rating, 1))
+    for obj in session.deleted:
+        if isinstance(obj, Review):
+            state = db.inspect(obj)
+            old = {attr: old_value(state, attr) for attr in tracked}
+            changes.append((old['room_id'], old['status'], old['rating'], -1))
+    if not changes:
+        return
+
+    connection = session.connection()
+    hotel_by_room = hotel_ids_for_rooms(connection, {room_id for room_id, _, _, _ in changes})
+    deltas = defaultdict(Counter)
+    for room_id, status, rating, sign in changes:
+        add_review_delta(deltas, room_id, hotel_by_room.get(room_id), status, rating, sign)
+    apply_review_stats_deltas(connection, deltas)
+
+
+def rebuild_review_stats():
+    """Xây lại toàn bộ bảng review_stats (và Hotel.rating) từ bảng reviews"""
+    db.session.query(ReviewStats).delete()
+    rows = db.session.query(
+        Review.room_id, Room.hotel_id, Review.status, Review.rating, func.count(Review.id)
+    ).join(Room, Room.id == Review.room_id)\
+        .group_by(Review.room_id, Room.hotel_id, Review.status, Review.rating).all()
+
+    deltas = defaultdict(Counter)
+    for room_id, hotel_id, status, rating, count in rows:
+        add_review_delta(deltas, room_id, hotel_id, status, rating, count)
+    apply_review_stats_deltas(db.session.connection(), deltas)
+    db.session.commit()
+
+
+# ===== DUYỆT ĐÁNH GIÁ HÀNG LOẠT =====
+MODERATION_STATUSES = {'approve': 'approved', 'reject': 'rejected'}
+MAX_BULK_REVIEWS = 500
+
+
+def moderate_reviews(review_ids, action, reply=None):
+    """
+    Áp dụng action ('approve', 'reject' hoặc 'reply') cho các review trong một transaction:
+    một câu UPDATE ... WHERE id IN (...) cho mỗi trạng thái cũ và một lần cộng review_stats.
+    Trả về {'updated': [id...], 'unchanged': [id...], 'not_found': [id...]}.
+    """
+    review_ids = sorted(set(review_ids))
+    reviews = Review.__table__
+    try:
+        if action == 'reply':
+            # Phản hồi không ảnh hưởng tới tổng hợp
+            found = [row[0] for row in db.session.execute(
+                select(reviews.c.id).where(reviews.c.id.in_(review_ids))).all()]
+            if found:
+                db.session.execute(reviews.update().where(reviews.c.id.in_(found))
+                                   .values(admin_reply=reply, reply_at=datetime.now()))
+            db.session.commit()
+            return {'updated': found, 'unchanged': [],
+                    'not_found': sorted(set(review_ids) - set(found))}
+
+        new_status = MODERATION_STATUSES[action]
+        # Không có RETURNING (MySQL): khóa các dòng review tới hết transaction
+        returning = db.engine.dialect.update_returning
+        query = db.session.query(Review.id, Review.room_id, Review.status, Review.rating)\
+            .filter(Review.id.in_(review_ids))
+        rows = (query if returning else query.with_for_update()).all()
+        by_old_status = defaultdict(list)
+        for row in rows:
+            if row.status != new_status:
+                by_old_status[row.status].append(row)
+
+        # Trạng thái cũ nằm trong WHERE nên review vừa được request khác duyệt/từ chối không bị cộng
+        # delta lần nữa; delta chỉ tính trên các dòng UPDATE thực sự đổi (RETURNING/OUTPUT)
+        changed = []    # (id, room_id, status cũ, rating)
+        for old_status, group in by_old_status.items():
+            statement = reviews.update()\
+                .where(reviews.c.id.in_([row.id for row in group]), reviews.c.status == old_status)\
+                .values(status=new_status)
+            if returning:
+                result = db.session.execute(statement.returning(reviews.c.id, reviews.c.room_id, reviews.c.rating))
+                changed += [(review_id, room_id, old_status, rating) for review_id, room_id, rating in result]
+            else:
+                db.session.execute(statement)
+                changed += [(row.id, row.room_id, old_status, row.rating) for row in group]
+
+        if changed:
+            # UPDATE hàng loạt không đi qua ORM event nên tự cộng delta vào review_stats
+            connection = db.session.connection()
+            hotel_by_room = hotel_ids_for_rooms(connection, {room_id for _, room_id, _, _ in changed})
+            deltas = defaultdict(Counter)
+            for _, room_id, old_status, rating in changed:
+                hotel_id = hotel_by_room.get(room_id)
+                add_review_delta(deltas, room_id, hotel_id, old_status, rating, -1)
+                add_review_delta(deltas, room_id, hotel_id, new_status, rating, 1)
+            apply_review_stats_deltas(connection, deltas)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if changed:
+        invalidate_dashboard_kpis('Review')
+    found = {row.id for row in rows}
+    updated = sorted(review_id for review_id, _, _, _ in changed)
+    return {
+        'updated': updated,
+        'unchanged': sorted(found - set(updated)),
+        'not_found': sorted(set(review_ids) - found),
+    }
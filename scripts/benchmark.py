@@ -0,0 +1,169 @@
+"""
+Benchmark luồng đặt phòng và các trang admin bằng Flask test client.
+
+    python scripts/generate_data.py --db sqlite:///bench.db      # tạo dữ liệu trước
+    python scripts/benchmark.py --db sqlite:///bench.db --iterations 50
+
+Mỗi endpoint được gọi nhiều lần; in ra p50/p99 độ trễ (ms) và số câu SQL trung bình/tối đa
+mỗi request để thấy regression trước khi deploy.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+class Recorder:
+    """Ghi lại độ trễ và số câu SQL của từng request theo nhãn endpoint"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.queries = 0
+        self.latency = defaultdict(list)
+        self.query_counts = defaultdict(list)
+        self.errors = defaultdict(int)
+        event.listen(engine, 'before_cursor_execute', self._on_query)
+
+    def _on_query(self, *args, **kwargs):
+        self.queries += 1
+
+    def call(self, label, func, *args, **kwargs):
+        self.queries = 0
+        started = time.perf_counter()
+        response = func(*args, **kwargs)
+        elapsed = (time.perf_counter() - started) * 1000
+        self.latency[label].append(elapsed)
+        self.query_counts[label].append(self.queries)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+        return response
+
+    def report(self):
+        rows = []
+        for label in self.latency:
+            lat = self.latency[label]
+            qc = self.query_counts[label]
+            rows.append({
+                'endpoint': label,
+                'n': len(lat),
+                'p50_ms': round(percentile(lat, 50), 2),
+                'p99_ms': round(percentile(lat, 99), 2),
+                'mean_ms': round(statistics.mean(lat), 2),
+                'queries_avg': round(statistics.mean(qc), 1),
+                'queries_max': max(qc),
+                'errors': self.errors[label],
+            })
+        return rows
+
+
+def print_table(rows):
+    header = f"{'endpoint':<28}{'n':>6}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'q avg':>8}{'q max':>8}{'err':>6}"
+    print(header)
+    print('-' * len(header))
+    for r in rows:
+        print(f"{r['endpoint']:<28}{r['n']:>6}{r['p50_ms']:>10}{r['p99_ms']:>10}{r['mean_ms']:>10}"
+              f"{r['queries_avg']:>8}{r['queries_max']:>8}{r['errors']:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark luồng đặt phòng / trang admin')
+    parser.add_argument('--db', default='sqlite:///bench.db', help='DATABASE_URL (đã sinh dữ liệu)')
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', help='ghi kết quả ra file JSON')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.db
+    random.seed(args.seed)
+
+    from app import create_app
+    from extensions import db
+    from models import Location, Room
+
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        location_ids = [row[0] for row in db.session.query(Location.id).all()]
+        room_ids = [row[0] for row in db.session.query(Room.id).filter(Room.status == 'available').all()]
+        recorder = Recorder(db.engine)
+
+    customer = app.test_client()
+    customer.post('/login', data={'email': 'customer@example.com', 'password': '123456'})
+    admin = app.test_client()
+    admin.post('/login', data={'email': 'admin@muongthanh.com', 'password': 'admin123'})
+
+    def random_stay():
+        check_in = datetime.now().date() + timedelta(days=random.randint(1, 300))
+        return check_in, check_in + timedelta(days=random.randint(1, 4))
+
+    def customer_flow():
+        check_in, check_out = random_stay()
+        recorder.call('GET /search', customer.get, '/search', query_string={
+            'location': random.choice(location_ids),
+            'check_in': check_in.isoformat(),
+            'check_out': check_out.isoformat(),
+            'guests': 2,
+        })
+        room_id = random.choice(room_ids)
+        recorder.call('GET /booking/<id>', customer.get, f'/booking/{room_id}')
+        response = recorder.call('POST /booking/<id>', customer.post, f'/booking/{room_id}', data={
+            'guest_name': 'Khách benchmark', 'guest_phone': '0900000000',
+            'check_in': check_in.isoformat(), 'check_out': check_out.isoformat(),
+            'adults': 1, 'children': 0,
+        })
+        location = response.headers.get('Location', '')
+        if '/payment/' not in location:
+            return  # phòng đã có người đặt: luồng dừng ở đây như người dùng thật
+        booking_id = int(location.rstrip('/').rsplit('/', 1)[-1])
+        recorder.call('GET /payment/<id>', customer.get, f'/payment/{booking_id}')
+        recorder.call('GET /qr/<id>.png', customer.get, f'/qr/{booking_id}.png')
+        recorder.call('GET payment simulate', customer.get, f'/payment/momo/simulate/{booking_id}')
+        recorder.call('GET /booking/confirm/<id>', customer.get, f'/booking/confirm/{booking_id}')
+        recorder.call('GET /my-bookings', customer.get, '/my-bookings')
+        recorder.call('GET /my_account', customer.get, '/my_account')
+
+    def admin_flow():
+        day = (datetime.now() + timedelta(days=random.randint(-30, 30))).strftime('%Y-%m-%d')
+        recorder.call('GET /admin/dashboard', admin.get, '/admin/dashboard')
+        recorder.call('GET /admin/room-map', admin.get, '/admin/room-map', query_string={'date': day})
+        recorder.call('GET /admin/revenue', admin.get, '/admin/revenue')
+        recorder.call('GET /admin/bookings', admin.get, '/admin/bookings')
+        recorder.call('GET /admin/reviews', admin.get, '/admin/reviews')
+        recorder.call('GET /room/<id>', admin.get, f'/room/{random.choice(room_ids)}')
+
+    for _ in range(args.warmup):
+        customer_flow()
+        admin_flow()
+    recorder.latency.clear()
+    recorder.query_counts.clear()
+    recorder.errors.clear()
+
+    for _ in range(args.iterations):
+        customer_flow()
+        admin_flow()
+
+    rows = recorder.report()
+    print_table(rows)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
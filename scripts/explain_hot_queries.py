@@ -0,0 +1,121 @@
+"""
+In kế hoạch thực thi (EXPLAIN) của các truy vấn nóng trên bảng bookings/reviews,
+trước và sau khi tạo các index khai báo trong model.
+
+Chạy trên database cục bộ / SQLite đã có dữ liệu mẫu:
+
+    python scripts/explain_hot_queries.py            # so sánh trước/sau (xóa rồi tạo lại index)
+    python scripts/explain_hot_queries.py --after    # chỉ in kế hoạch với index hiện tại
+
+Việc xóa index chỉ được phép trên SQLite, trừ khi truyền thêm --force.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, func, select  # noqa: E402
+
+from app import create_app  # noqa: E402
+from commands import ensure_indexes  # noqa: E402
+from extensions import db  # noqa: E402
+from models import Booking, Review  # noqa: E402
+
+
+def hot_queries():
+    """Các truy vấn nóng: (tên, câu lệnh select)"""
+    now = datetime.now()
+    return [
+        ('overlap check (room_availability)', select(Booking.id, Booking.room_id).where(
+            Booking.room_id.in_([1, 2, 3]),
+            Booking.status != 'cancelled',
+            Booking.check_in < now + timedelta(days=3),
+            Booking.check_out > now,
+        )),
+        ('room map bookings on date', select(Booking).where(
+            Booking.check_in <= now,
+            Booking.check_out > now,
+            Booking.status.in_(['confirmed', 'pending']),
+        )),
+        ('revenue by created_at', select(func.sum(Booking.total_price)).where(
+            Booking.payment_status == 'paid',
+            Booking.created_at >= now - timedelta(days=30),
+            Booking.created_at < now,
+        )),
+        ('my_bookings', select(Booking).where(Booking.user_id == 2)
+            .order_by(Booking.created_at.desc())),
+        ('expired booking sweep', select(Booking.id).where(
+            and_(Booking.status == 'confirmed', Booking.check_out < now))),
+        ('admin bookings keyset page', select(Booking).where(Booking.payment_status != 'pending')
+            .order_by(Booking.created_at.desc(), Booking.id.desc()).limit(51)),
+        ('pending reviews', select(Review).where(Review.status == 'pending')
+            .order_by(Review.created_at.desc())),
+        ('room reviews', select(Review).where(Review.room_id == 1, Review.status == 'approved')),
+    ]
+
+
+def explain(connection, stmt):
+    """Trả về danh sách dòng kế hoạch thực thi theo dialect"""
+    dialect = connection.dialect.name
+    compiled = stmt.compile(dialect=connection.dialect, compile_kwargs={'render_postcompile': True})
+    sql = str(compiled)
+    if compiled.positional:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        params = compiled.params
+
+    if dialect == 'sqlite':
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+        return [row[-1] for row in rows]
+    if dialect == 'mssql':
+        connection.exec_driver_sql('SET SHOWPLAN_TEXT ON')
+        try:
+            result = connection.exec_driver_sql(sql, params)
+            return [row[0] for row in result.fetchall()]
+        finally:
+            connection.exec_driver_sql('SET SHOWPLAN_TEXT OFF')
+    rows = connection.exec_driver_sql('EXPLAIN ' + sql, params).fetchall()
+    return [row[0] for row in rows]
+
+
+def print_plans(title):
+    print(f"\n===== {title} =====")
+    with db.engine.connect() as connection:
+        for name, stmt in hot_queries():
+            print(f"\n-- {name}")
+            for line in explain(connection, stmt):
+                print(f"   {line}")
+
+
+def drop_model_indexes():
+    inspector = db.inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if not table.indexes or not inspector.has_table(table.name):
+            continue
+        existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                index.drop(bind=db.engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--after', action='store_true', help='chỉ in kế hoạch với index hiện tại')
+    parser.add_argument('--force', action='store_true', help='cho phép xóa index trên DB khác SQLite')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if not args.after:
+            if db.engine.dialect.name != 'sqlite' and not args.force:
+                parser.error('chỉ xóa index tạm thời trên SQLite; dùng --force cho DB khác')
+            drop_model_indexes()
+            print_plans('TRƯỚC khi có index')
+        ensure_indexes()
+        print_plans('SAU khi có index')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Sinh dữ liệu giả lập quy mô lớn (hotels, rooms, users, bookings, reviews) để đo hiệu năng.
+
+    python scripts/generate_data.py --db sqlite:///bench.db --hotels 20 --rooms-per-hotel 150 \
+        --bookings 1000000 --users 20000
+
+Booking của mỗi phòng được sinh nối tiếp nhau theo thời gian (có khoảng trống ngẫu nhiên),
+thỉnh thoảng có booking đã hủy chồng lên booking khác. Trạng thái/thanh toán phụ thuộc vào
+ngày so với hiện tại (quá khứ: completed/cancelled, tương lai: confirmed/pending).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOM_TYPES = [('Standard', 800000, 2, 25), ('Deluxe', 1200000, 3, 35),
+              ('Suite', 2000000, 4, 50), ('Family', 1600000, 5, 45)]
+PAYMENT_METHODS = ['momo', 'vnpay', 'zalopay', 'banking']
+CHUNK = 10000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Sinh dữ liệu giả lập cho benchmark')
+    parser.add_argument('--db', default='sqlite:///bench.db', help='DATABASE_URL đích (mặc định sqlite:///bench.db)')
+    parser.add_argument('--locations', type=int, default=5)
+    parser.add_argument('--hotels', type=int, default=10)
+    parser.add_argument('--rooms-per-hotel', type=int, default=100)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--bookings', type=int, default=100000)
+    parser.add_argument('--review-ratio', type=float, default=0.3,
+                        help='tỷ lệ booking completed có đánh giá')
+    parser.add_argument('--days-back', type=int, default=730, help='số ngày lịch sử')
+    parser.add_argument('--days-ahead', type=int, default=180, help='số ngày đặt trước tối đa')
+    parser.add_argument('--seed', type=int, default=2025)
+    return parser.parse_args()
+
+
+def insert_chunked(db, table, rows):
+    for i in range(0, len(rows), CHUNK):
+        db.session.execute(table.insert(), rows[i:i + CHUNK])
+    db.session.commit()
+
+
+def main():
+    args = parse_args()
+    os.environ['DATABASE_URL'] = args.db
+    random.seed(args.seed)
+
+    from werkzeug.security import generate_password_hash
+    from app import create_app
+    from commands import ensure_indexes, init_db
+    from extensions import db
+    from models import Booking, Hotel, Location, Review, Room, User
+    from reporting import rebuild_revenue_rollup
+    from review_stats import rebuild_review_stats
+
+    started = time.perf_counter()
+    app = create_app()
+    init_db(app)
+
+    with app.app_context():
+        db.create_all()
+        ensure_indexes()
+        now = datetime.now().replace(minute=0, second=0, microsecond=0)
+
+        # --- Locations / hotels / rooms ---
+        insert_chunked(db, Location.__table__, [
+            dict(name=f'Địa điểm {i}', city=f'Thành phố {i}', description='Dữ liệu giả lập')
+            for i in range(args.locations)
+        ])
+        location_ids = [row[0] for row in db.session.query(Location.id).all()]
+
+        insert_chunked(db, Hotel.__table__, [
+            dict(name=f'Mường Thanh Bench {i}', location_id=random.choice(location_ids),
+                 address=f'{i} Đường Giả Lập', rating=0, created_at=now)
+            for i in range(args.hotels)
+        ])
+        hotel_ids = [row[0] for row in db.session.query(Hotel.id)
+                     .filter(Hotel.name.like('Mường Thanh Bench %')).all()]
+
+        rooms = []
+        for hotel_id in hotel_ids:
+            for n in range(args.rooms_per_hotel):
+                floor = n // 20 + 1
+                room_type, price, max_people, size = random.choice(ROOM_TYPES)
+                rooms.append(dict(hotel_id=hotel_id, room_number=f'{floor}{n % 20 + 1:02d}',
+                                  room_type=room_type, price=price, max_people=max_people,
+                                  size=size, floor=floor, created_at=now,
+                                  status='maintenance' if random.random() < 0.02 else 'available'))
+        insert_chunked(db, Room.__table__, rooms)
+        room_rows = db.session.query(Room.id, Room.price).filter(Room.hotel_id.in_(hotel_ids)).all()
+
+        # --- Users (một hash dùng chung, băm pbkdf2 cho từng user quá chậm) ---
+        password = generate_password_hash('123456', method='pbkdf2:sha256')
+        tag = int(time.time())
+        insert_chunked(db, User.__table__, [
+            dict(full_name=f'Khách {i}', email=f'bench{tag}_{i}@example.com', password=password,
+                 phone=f'09{i:08d}', role='customer', created_at=now)
+            for i in range(args.users)
+        ])
+        user_ids = [row[0] for row in db.session.query(User.id)
+                    .filter(User.email.like(f'bench{tag}_%')).all()]
+
+        # --- Bookings: chia đều cho các phòng, nối tiếp nhau theo thời gian ---
+        per_room = max(1, args.bookings // max(1, len(room_rows)))
+        window_start = now - timedelta(days=args.days_back)
+        total_days = args.days_back + args.days_ahead
+        avg_step = max(1.0, total_days / per_room)
+
+        bookings = []
+        for room_id, price in room_rows:
+            cursor = window_start + timedelta(days=random.random() * avg_step)
+            for _ in range(per_room):
+                nights = random.choice([1, 1, 2, 2, 3, 4, 7])
+                check_in = cursor.replace(hour=14)
+                check_out = check_in + timedelta(days=nights)
+                created_at = check_in - timedelta(days=random.randint(1, 60), hours=random.randint(0, 23))
+                cancelled = random.random() < 0.08
+                if cancelled:
+                    status, payment_status = 'cancelled', random.choice(['unpaid', 'failed', 'paid'])
+                elif check_out < now:
+                    status, payment_status = 'completed', 'paid'
+                elif random.random() < 0.8:
+                    status, payment_status = 'confirmed', 'paid'
+                else:
+                    status, payment_status = 'pending', random.choice(['unpaid', 'pending'])
+                bookings.append(dict(
+                    user_id=random.choice(user_ids) if random.random() < 0.9 else None,
+                    room_id=room_id, guest_name='Khách giả lập', guest_phone='0900000000',
+                    check_in=check_in, check_out=check_out, adults=random.randint(1, 2), children=0,
+                    total_price=float(price) * nights, status=status, payment_status=payment_status,
+                    payment_method=random.choice(PAYMENT_METHODS) if payment_status != 'unpaid' else None,
+                    created_at=created_at, updated_at=created_at,
+                ))
+                # Booking đã hủy không chiếm phòng nên booking sau được phép chồng lên nó
+                if not cancelled:
+                    gap = random.expovariate(1 / max(0.5, avg_step - nights))
+                    cursor += timedelta(days=nights + gap)
+                if len(bookings) >= CHUNK:
+                    insert_chunked(db, Booking.__table__, bookings)
+                    bookings = []
+        insert_chunked(db, Booking.__table__, bookings)
+
+        # --- Reviews cho một phần booking completed ---
+        completed = db.session.query(Booking.id, Booking.room_id, Booking.user_id, Booking.check_out)\
+            .filter(Booking.status == 'completed', Booking.user_id.isnot(None))\
+            .outerjoin(Review, Review.booking_id == Booking.id).filter(Review.id.is_(None)).all()
+        reviews = []
+        for booking_id, room_id, user_id, check_out in completed:
+            if random.random() >= args.review_ratio:
+                continue
+            reviews.append(dict(
+                room_id=room_id, user_id=user_id, booking_id=booking_id,
+                rating=random.choices([1, 2, 3, 4, 5], weights=[3, 5, 15, 40, 37])[0],
+                comment='Đánh giá giả lập', created_at=check_out + timedelta(days=1),
+                status=random.choices(['approved', 'pending', 'rejected'], weights=[80, 15, 5])[0],
+            ))
+        insert_chunked(db, Review.__table__, reviews)
+
+        # Insert hàng loạt bỏ qua ORM event nên dựng lại các bảng/cache tổng hợp
+        rebuild_revenue_rollup()
+        rebuild_review_stats()
+
+        print(f"✅ {len(hotel_ids)} hotels, {len(room_rows)} rooms, {len(user_ids)} users, "
+              f"{db.session.query(Booking).count()} bookings, {len(reviews)} reviews mới "
+              f"trong {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Đo thời gian khởi động worker (import + create_app) cho từng cấu hình blueprint.
+
+    python scripts/startup_benchmark.py --db sqlite:///bench.db --runs 10
+
+Mỗi lần đo chạy trong một process Python mới (giống worker gunicorn vừa fork/spawn); các profile được
+đo xen kẽ nhau để nhiễu của máy chia đều. In ra thời gian trung vị/tối đa và các module nặng đã bị nạp
+(qrcode, PIL, mã admin...).
+
+Phần import (Flask, SQLAlchemy, models và các module đăng ký event của session mà mọi worker đều cần,
+kể cả profile public) giống nhau ở mọi profile và chiếm phần lớn thời gian; profile chỉ thay đổi phần
+create_app() (import và đăng ký blueprint). Cột "create_app ms" và "so với full" là phần chênh lệch thật
+giữa các profile; tổng thời gian dao động theo máy nhiều hơn mức chênh lệch này.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    'full': 'public,booking,payment,account,admin',
+    'customer': 'public,booking,payment,account',
+    'public': 'public',
+}
+WATCHED_MODULES = ['qrcode', 'PIL', 'payment_services', 'blueprints.admin', 'blueprints.payment']
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app(blueprints=sys.argv[1])
+ready = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'total_ms': (ready - started) * 1000,
+    'modules': len(sys.modules),
+    'loaded': [name for name in json.loads(sys.argv[2]) if name in sys.modules],
+}))
+"""
+
+
+def measure(blueprints, env):
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, blueprints, json.dumps(WATCHED_MODULES)],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Đo thời gian khởi động theo cấu hình blueprint')
+    parser.add_argument('--db', default='sqlite://', help='DATABASE_URL (không cần có dữ liệu)')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--profile', action='append', choices=sorted(PROFILES),
+                        help='chỉ đo profile này (có thể lặp lại)')
+    args = parser.parse_args()
+
+    env = dict(os.environ, DATABASE_URL=args.db, SQL_PROFILER_ENABLED='0', LOG_REQUESTS='0')
+    names = args.profile or list(PROFILES)
+    runs = {name: [] for name in names}
+    for _ in range(args.runs):
+        for name in names:
+            runs[name].append(measure(PROFILES[name], env))
+
+    def create_app_ms(name):
+        return statistics.median(r['total_ms'] - r['import_ms'] for r in runs[name])
+
+    baseline = create_app_ms('full') if 'full' in runs else None
+    header = (f"{'profile':<10}{'import ms':>12}{'create_app ms':>15}{'so với full':>13}"
+              f"{'p50 ms':>10}{'max ms':>10}{'modules':>10}  loaded")
+    print(header)
+    print('-' * len(header))
+    for name in names:
+        totals = [r['total_ms'] for r in runs[name]]
+        delta = f"{create_app_ms(name) - baseline:+.1f}" if baseline is not None else '-'
+        print(f"{name:<10}{statistics.median(r['import_ms'] for r in runs[name]):>12.1f}"
+              f"{create_app_ms(name):>15.1f}{delta:>13}"
+              f"{statistics.median(totals):>10.1f}{max(totals):>10.1f}"
+              f"{runs[name][-1]['modules']:>10}  {', '.join(runs[name][-1]['loaded']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Stress test tạo booking đồng thời: nhiều thread cùng đặt một vài phòng với các khoảng ngày giao nhau.
+
+    python scripts/stress_booking.py --db sqlite:///stress.db --threads 16 --attempts 50
+    python scripts/stress_booking.py --db postgresql://.../muongthanh --threads 32 --naive
+    python scripts/stress_booking.py --db "mssql+pyodbc://.../muongthanh?driver=..." --threads 32
+    python scripts/stress_booking.py --show-lock-sql        # chỉ in câu khóa phòng của từng dialect
+
+Sau khi chạy, kiểm tra trong DB không có hai booking (chưa hủy) nào của cùng phòng giao nhau,
+và in ra throughput (lượt đặt/giây). --naive chạy kiểu cũ (kiểm tra rồi insert, không khóa)
+để so sánh: thường sinh ra booking trùng lịch.
+
+Trước khi chạy, script in câu SQL khóa phòng của dialect đang dùng và dừng lại nếu câu đó không
+thực sự khóa (ví dụ with_for_update() bị bỏ qua trên SQL Server). Kết quả trên SQLite không chứng
+minh gì cho SQL Server: hãy chạy với --db trỏ tới database thật.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+GUEST_NAME = 'Khách stress test'
+LOCK_MARKERS = {'mssql': 'UPDLOCK', 'postgresql': 'FOR UPDATE', 'mysql': 'FOR UPDATE'}
+
+
+def lock_sql(dialect):
+    """Câu SQL khóa phòng của create_booking() biên dịch cho dialect"""
+    from booking_service import room_lock_statement
+    return str(room_lock_statement(1).compile(dialect=dialect))
+
+
+def show_lock_sql():
+    from sqlalchemy.dialects import mssql, mysql, postgresql
+    ok = True
+    for name, module in (('mssql', mssql), ('postgresql', postgresql), ('mysql', mysql)):
+        sql = lock_sql(module.dialect())
+        locked = LOCK_MARKERS[name] in sql
+        ok = ok and locked
+        print(f"[{name}] {'khóa dòng' if locked else '❌ KHÔNG khóa'}\n{sql}\n")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stress test tạo booking đồng thời')
+    parser.add_argument('--db', default='sqlite:///stress.db', help='DATABASE_URL')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--attempts', type=int, default=50, help='số lượt đặt của mỗi thread')
+    parser.add_argument('--rooms', type=int, default=2, help='số phòng tranh chấp')
+    parser.add_argument('--days', type=int, default=20, help='khoảng ngày check-in ngẫu nhiên')
+    parser.add_argument('--naive', action='store_true', help='kiểm tra rồi insert, không khóa phòng')
+    parser.add_argument('--seed', type=int, default=17)
+    parser.add_argument('--show-lock-sql', action='store_true',
+                        help='chỉ in câu SQL khóa phòng cho mssql/postgresql/mysql rồi thoát')
+    args = parser.parse_args()
+
+    if args.show_lock_sql:
+        sys.exit(0 if show_lock_sql() else 1)
+
+    os.environ['DATABASE_URL'] = args.db
+    os.environ.setdefault('LOG_REQUESTS', '0')
+    os.environ.setdefault('BOOKING_SWEEP_INTERVAL', '0')
+
+    from app import create_app
+    from booking_service import RoomUnavailableError, create_booking, is_room_available
+    from commands import init_db
+    from extensions import db
+    from models import Booking, Room
+
+    app = create_app(blueprints=[])
+    init_db(app)
+
+    with app.app_context():
+        dialect = db.engine.dialect
+        if dialect.name != 'sqlite':
+            sql = lock_sql(dialect)
+            print(f"Câu khóa phòng ({dialect.name}):\n{sql}")
+            if dialect.name in LOCK_MARKERS and LOCK_MARKERS[dialect.name] not in sql:
+                print('❌ câu khóa phòng không khóa dòng trên dialect này')
+                sys.exit(1)
+        Booking.query.filter(Booking.guest_name == GUEST_NAME).delete()
+        db.session.commit()
+        room_ids = [row[0] for row in db.session.query(Room.id).order_by(Room.id).limit(args.rooms)]
+
+    base_day = datetime.now().replace(hour=14, minute=0, second=0, microsecond=0) + timedelta(days=400)
+    results = Counter()
+    results_lock = threading.Lock()
+    start_barrier = threading.Barrier(args.threads)
+
+    def worker(thread_no):
+        rng = random.Random(args.seed + thread_no)
+        start_barrier.wait()
+        for _ in range(args.attempts):
+            check_in = base_day + timedelta(days=rng.randrange(args.days))
+            booking = Booking(
+                room_id=rng.choice(room_ids), check_in=check_in,
+                check_out=check_in + timedelta(days=rng.randint(1, 3)),
+                guest_name=GUEST_NAME, guest_phone='0900000000',
+                total_price=1000000, status='pending', payment_status='unpaid',
+            )
+            with app.app_context():
+                try:
+                    if args.naive:
+                        if not is_room_available(booking.room_id, booking.check_in, booking.check_out):
+                            raise RoomUnavailableError()
+                        db.session.add(booking)
+                        db.session.commit()
+                    else:
+                        create_booking(booking)
+                    outcome = 'created'
+                except RoomUnavailableError:
+                    db.session.rollback()
+                    outcome = 'unavailable'
+                except Exception as e:
+                    db.session.rollback()
+                    outcome = f'error: {type(e).__name__}'
+            with results_lock:
+                results[outcome] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    # Kiểm tra trùng lịch trực tiếp trên DB
+    with app.app_context():
+        rows = db.session.query(Booking.room_id, Booking.check_in, Booking.check_out)\
+            .filter(Booking.guest_name == GUEST_NAME, Booking.status != 'cancelled')\
+            .order_by(Booking.room_id, Booking.check_in).all()
+        dialect = db.engine.dialect.name
+    by_room = defaultdict(list)
+    for room_id, check_in, check_out in rows:
+        by_room[room_id].append((check_in, check_out))
+    overlaps = 0
+    for stays in by_room.values():
+        for (_, prev_out), (next_in, _) in zip(stays, stays[1:]):
+            if next_in < prev_out:
+                overlaps += 1
+
+    total = sum(results.values())
+    print(f"mode={'naive' if args.naive else 'locked'} db={dialect} "
+          f"threads={args.threads} attempts={total} time={elapsed:.2f}s "
+          f"throughput={total / elapsed:.1f} lượt/s")
+    for outcome, count in sorted(results.items()):
+        print(f"  {outcome:<24}{count:>8}")
+    print(f"  {'booking trùng lịch':<24}{overlaps:>8}")
+    sys.exit(1 if overlaps else 0)
+
+
+if __name__ == '__main__':
+    main()